@@ -2,11 +2,21 @@
 
 from fastapi import APIRouter
 
-from app.api.endpoints import health, auth, activities, stats
+from app.api.endpoints import (
+    health, auth, athlete, activities, stats, dashboard, segments, gear, imports, events, profiling, webhooks,
+)
 
 router = APIRouter()
 
 router.include_router(health.router, prefix="/health", tags=["Health"])
 router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
+router.include_router(athlete.router, prefix="/athlete", tags=["Athlete"])
 router.include_router(activities.router, prefix="/activities", tags=["Activities"])
 router.include_router(stats.router, prefix="/stats", tags=["Statistics"])
+router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+router.include_router(segments.router, prefix="/segments", tags=["Segments"])
+router.include_router(gear.router, prefix="/gear", tags=["Gear"])
+router.include_router(imports.router, prefix="/import", tags=["Import"])
+router.include_router(events.router, prefix="/events", tags=["Events"])
+router.include_router(profiling.router, prefix="/profiling", tags=["Profiling"])
+router.include_router(webhooks.router, prefix="/webhooks", tags=["Webhooks"])
@@ -1,13 +1,53 @@
 """Activities endpoints."""
 
-from typing import List, Optional
-from fastapi import APIRouter, Query, HTTPException, Header, Cookie
+import asyncio
+import logging
+from typing import Any, Dict, FrozenSet, List, Literal, Optional, Type
+from fastapi import APIRouter, BackgroundTasks, Query, HTTPException, Header, Cookie, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
-from app.models.activity import Activity, ActivityDetail, ActivitySummary
+from app.models.activity import (
+    DETAIL_GETTERS,
+    SUMMARY_GETTERS,
+    Activity,
+    ActivityDetail,
+    ActivitySearchHit,
+    ActivitySearchResults,
+    ActivitySummary,
+    Getters,
+    SimilarActivities,
+    SimilarActivity,
+    StreamBestEffort,
+    StreamBestEfforts,
+    SyncResult,
+)
+from app.models.fieldsets import parse_fields, sparse_list_adapter, sparse_model
 from app.core.config import settings
+from app.core.profiling import ProfiledRoute
+from app.services.activity_index import activity_index
+from app.services.activity_store import activity_store
+from app.services.athlete import resolve_athlete_id
+from app.services.compute import ComputeTimeout, compute_executor
+from app.services.export import gpx_document, load_cached_streams, tcx_document
+from app.services.route_index import route_index
+from app.services.search_index import search_index
+from app.services.stream_analytics import BEST_EFFORT_DISTANCES, best_efforts
+from app.services.stream_cache import stream_cache, streams_by_type
+from app.services.stream_encoding import (
+    THREADED_ENCODE_VALUES,
+    available_media_types,
+    encode_streams,
+    negotiate_encoding,
+    negotiate_media_type,
+)
+from app.services.rate_limit import Priority
 from app.services.strava_client import StravaApiClient
+from app.services.sync import sync_service
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=ProfiledRoute)
 
 
 def get_access_token(
@@ -22,6 +62,25 @@ def get_access_token(
     return authorization[7:]
 
 
+def _build(
+    model: Type[BaseModel],
+    getters: Getters,
+    a: Dict[str, Any],
+    fields: Optional[FrozenSet[str]] = None,
+) -> BaseModel:
+    """Build ``model`` (or its sparse variant for ``fields``) from a Strava payload."""
+    if fields is None:
+        return model(**{name: getters[name](a) for name in model.model_fields})
+    return sparse_model(model, fields)(**{name: getters[name](a) for name in fields})
+
+
+def _parse_fields_param(fields: Optional[str], model: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    try:
+        return parse_fields(fields, model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("", response_model=List[ActivitySummary])
 async def get_activities(
     authorization: str | None = Header(None),
@@ -31,6 +90,7 @@ async def get_activities(
     activity_type: Optional[str] = Query(None, description="Filter by activity type (Run, Ride, etc.)"),
     after: Optional[int] = Query(None, description="Unix timestamp - activities after this time"),
     before: Optional[int] = Query(None, description="Unix timestamp - activities before this time"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
 ):
     """
     Get list of activities.
@@ -38,6 +98,7 @@ async def get_activities(
     """
     token = get_access_token(authorization, access_token)
     client = StravaApiClient(token)
+    selected = _parse_fields_param(fields, ActivitySummary)
     
     try:
         activities = await client.get_activities(page=page, per_page=per_page, before=before, after=after)
@@ -48,19 +109,121 @@ async def get_activities(
             if activity_type and a.get("type") != activity_type:
                 continue
                 
-            result.append(ActivitySummary(
-                id=a["id"],
-                name=a.get("name", "Untitled"),
-                type=a.get("type", "Unknown"),
-                distance=a.get("distance", 0.0),
-                moving_time=a.get("moving_time", 0),
-                elapsed_time=a.get("elapsed_time", 0),
-                total_elevation_gain=a.get("total_elevation_gain", 0.0),
-                start_date=a.get("start_date", ""),
-                average_speed=a.get("average_speed", 0.0),
-                max_speed=a.get("max_speed", 0.0),
-            ))
+            result.append(_build(ActivitySummary, SUMMARY_GETTERS, a, selected))
         
+        if selected is not None:
+            # Serialize with the sparse model; response_model would require every field
+            return Response(
+                content=sparse_list_adapter(ActivitySummary, selected).dump_json(result),
+                media_type="application/json",
+            )
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/sync", response_model=SyncResult)
+async def sync_activities(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    max_activities: Optional[int] = Query(None, ge=1, le=500, description="Max activity details to fetch in this run"),
+):
+    """
+    Sync new activities into the local store.
+    Fetches details with all segment efforts so local indexes stay current.
+    """
+    token = get_access_token(authorization, access_token)
+    # Backfills must not crowd out interactive page loads
+    client = StravaApiClient(token, priority=Priority.BACKGROUND)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        return await sync_service.sync_athlete(client, athlete_id, max_activities=max_activities)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/search", response_model=ActivitySearchResults)
+async def search_activities(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in name, description or type"),
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+):
+    """
+    Full-text search over synced activities.
+    Returns matches ranked by relevance from the local search index.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        # Fetch one extra row to know whether another page exists
+        rows = search_index.search(athlete_id, q, limit=per_page + 1, offset=(page - 1) * per_page)
+        return ActivitySearchResults(
+            query=q,
+            page=page,
+            per_page=per_page,
+            has_more=len(rows) > per_page,
+            results=[
+                ActivitySearchHit(
+                    id=r["id"],
+                    name=r["name"] or "Untitled",
+                    type=r["type"],
+                    start_date=r["start_date"],
+                    distance=r["distance"] or 0.0,
+                    moving_time=r["moving_time"] or 0,
+                    snippet=r["snippet"] or None,
+                    score=r["score"],
+                )
+                for r in rows[:per_page]
+            ],
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/local", response_model=List[ActivitySummary])
+async def get_local_activities(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    activity_type: Optional[str] = Query(None, description="Filter by activity type (Run, Ride, etc.)"),
+    after: Optional[int] = Query(None, description="Unix timestamp - activities after this time"),
+    before: Optional[int] = Query(None, description="Unix timestamp - activities before this time"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
+):
+    """
+    Get list of synced activities, newest first.
+    Filters and paginates the in-memory activity index without calling Strava.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+    selected = _parse_fields_param(fields, ActivitySummary)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        columns = activity_index.athlete(athlete_id)
+        # Strava's `after` is exclusive
+        matches = columns.select(
+            after=after + 1 if after is not None else None,
+            before=before,
+            activity_type=activity_type,
+        )
+        start = len(matches) - (page - 1) * per_page
+        ids = [columns.arrays["id"][i] for i in reversed(matches[max(start - per_page, 0):max(start, 0)])]
+        # Only the page is read from the store, for names and exact values
+        stored = activity_store.get_many(athlete_id, ids)
+        result = [_build(ActivitySummary, SUMMARY_GETTERS, stored[i], selected) for i in ids if i in stored]
+
+        if selected is not None:
+            return Response(
+                content=sparse_list_adapter(ActivitySummary, selected).dump_json(result),
+                media_type="application/json",
+            )
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -71,6 +234,7 @@ async def get_activity(
     activity_id: int,
     authorization: str | None = Header(None),
     access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)"),
 ):
     """
     Get detailed activity by ID.
@@ -78,29 +242,15 @@ async def get_activity(
     """
     token = get_access_token(authorization, access_token)
     client = StravaApiClient(token)
+    selected = _parse_fields_param(fields, ActivityDetail)
     
     try:
         a = await client.get_activity(activity_id)
         
-        return ActivityDetail(
-            id=a["id"],
-            name=a.get("name", "Untitled"),
-            type=a.get("type", "Unknown"),
-            sport_type=a.get("sport_type", a.get("type", "Unknown")),
-            distance=a.get("distance", 0.0),
-            moving_time=a.get("moving_time", 0),
-            elapsed_time=a.get("elapsed_time", 0),
-            total_elevation_gain=a.get("total_elevation_gain", 0.0),
-            start_date=a.get("start_date", ""),
-            start_date_local=a.get("start_date_local", ""),
-            timezone=a.get("timezone", ""),
-            average_speed=a.get("average_speed", 0.0),
-            max_speed=a.get("max_speed", 0.0),
-            average_heartrate=a.get("average_heartrate"),
-            max_heartrate=a.get("max_heartrate"),
-            calories=a.get("calories"),
-            description=a.get("description"),
-        )
+        detail = _build(ActivityDetail, DETAIL_GETTERS, a, selected)
+        if selected is not None:
+            return Response(content=detail.model_dump_json(), media_type="application/json")
+        return detail
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -125,33 +275,192 @@ async def get_activity_laps(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/{activity_id}/similar", response_model=SimilarActivities)
+async def get_similar_activities(
+    activity_id: int,
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    max_distance: float = Query(
+        settings.ROUTE_MATCH_METERS,
+        gt=0,
+        description=f"Fréchet distance in meters (capped at {settings.ROUTE_CELL_METERS:g})",
+    ),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """
+    Get synced activities that repeat this activity's route.
+    Start/end grid buckets select candidates; Fréchet distance, computed in
+    the compute executor, confirms them.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        max_distance = min(max_distance, settings.ROUTE_CELL_METERS)
+        matches = await route_index.similar(athlete_id, activity_id, max_distance)
+    except ComputeTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if matches is None:
+        raise HTTPException(status_code=404, detail="Activity not synced or has no GPS track")
+
+    matches = matches[:limit]
+    stored = activity_store.get_many(athlete_id, [match_id for match_id, _ in matches])
+    results = []
+    for match_id, frechet in matches:
+        a = stored.get(match_id)
+        if a is None:
+            continue
+        results.append(SimilarActivity(
+            id=a["id"],
+            name=a.get("name", "Untitled"),
+            type=a.get("type", "Unknown"),
+            start_date=a.get("start_date", ""),
+            distance=a.get("distance", 0.0),
+            moving_time=a.get("moving_time", 0),
+            elapsed_time=a.get("elapsed_time", 0),
+            average_speed=a.get("average_speed", 0.0),
+            frechet_distance=frechet,
+        ))
+    return SimilarActivities(activity_id=activity_id, max_distance=max_distance, results=results)
+
+
+@router.get("/{activity_id}/best-efforts", response_model=StreamBestEfforts)
+async def get_activity_best_efforts(
+    activity_id: int,
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+):
+    """
+    Get the fastest stretch over standard distances from the activity's streams.
+    Computed in the compute executor from cached time and distance streams.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        columns = await load_cached_streams(client, athlete_id, activity_id, ("time", "distance"))
+        if "time" not in columns or "distance" not in columns:
+            return StreamBestEfforts(activity_id=activity_id, efforts=[])
+        time_values = stream_cache.read(columns["time"], 0, columns["time"].length)
+        distance_values = stream_cache.read(columns["distance"], 0, columns["distance"].length)
+        results = await compute_executor.run(
+            best_efforts,
+            BEST_EFFORT_DISTANCES,
+            key=("best_efforts", athlete_id, activity_id),
+            arrays={"time": time_values, "distance": distance_values},
+        )
+    except ComputeTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamBestEfforts(
+        activity_id=activity_id,
+        efforts=[
+            StreamBestEffort(name=name, target_distance=BEST_EFFORT_DISTANCES[name], **effort)
+            for name, effort in results.items()
+            if effort is not None
+        ],
+    )
+
+
+async def _cache_streams(
+    client: StravaApiClient,
+    activity_id: int,
+    requested_keys: List[str],
+    streams: Dict[str, List[Any]],
+) -> None:
+    """Write-through so a later export can skip the upstream call; best effort."""
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        await asyncio.to_thread(stream_cache.save, athlete_id, activity_id, requested_keys, streams)
+    except Exception:
+        logger.warning("Could not cache streams of activity %s", activity_id, exc_info=True)
+
+
 @router.get("/{activity_id}/streams")
 async def get_activity_streams(
     activity_id: int,
+    background_tasks: BackgroundTasks,
     authorization: str | None = Header(None),
     access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    accept: str | None = Header(None),
+    accept_encoding: str | None = Header(None),
     keys: str = Query("time,distance,heartrate,altitude", description="Comma-separated stream types"),
 ):
     """
     Get activity streams (time-series data).
     Returns GPS, heartrate, altitude, and other data streams.
+
+    Send `Accept: application/vnd.strarun.columns` (or
+    `application/vnd.apache.arrow.stream`) for typed binary columns;
+    `Accept-Encoding` enables gzip/brotli compression.
     """
     token = get_access_token(authorization, access_token)
+    media_type = negotiate_media_type(accept)
+    if media_type is None:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Supported media types: {', '.join(available_media_types())}",
+        )
     client = StravaApiClient(token)
     
     try:
         requested_keys = keys.split(",")
         streams_data = await client.get_activity_streams(activity_id, requested_keys)
-        
-        streams = {}
-        for stream in streams_data:
-            stream_type = stream.get("type")
-            if stream_type:
-                streams[stream_type] = stream.get("data", [])
-
-        return {
-            "activity_id": activity_id,
-            "streams": streams,
-        }
+        streams = streams_by_type(streams_data)
+        # After the response is sent, so caching never delays or fails it
+        background_tasks.add_task(_cache_streams, client, activity_id, requested_keys, streams)
+
+        encode = (activity_id, streams, media_type, negotiate_encoding(accept_encoding))
+        if sum(len(values) for values in streams.values()) >= THREADED_ENCODE_VALUES:
+            body, encoding = await asyncio.to_thread(encode_streams, *encode)
+        else:
+            body, encoding = encode_streams(*encode)
+        headers = {"Vary": "Accept, Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=media_type, headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+EXPORT_MEDIA_TYPES = {
+    "gpx": "application/gpx+xml",
+    "tcx": "application/vnd.garmin.tcx+xml",
+}
+
+
+@router.get("/{activity_id}/export.{export_format}")
+async def export_activity(
+    activity_id: int,
+    export_format: Literal["gpx", "tcx"],
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+):
+    """
+    Export an activity as GPX or TCX.
+    Streamed in chunks from locally cached streams (fetched once from Strava).
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        activity = activity_store.get(activity_id, athlete_id=athlete_id)
+        if activity is None:
+            activity = await client.get_activity(activity_id)
+        columns = await load_cached_streams(client, athlete_id, activity_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    render = gpx_document if export_format == "gpx" else tcx_document
+    return StreamingResponse(
+        render(activity, columns),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="activity-{activity_id}.{export_format}"'},
+    )
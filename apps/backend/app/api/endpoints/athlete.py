@@ -0,0 +1,43 @@
+"""Athlete endpoints."""
+
+from fastapi import APIRouter, Query, HTTPException, Header, Cookie
+
+from app.models.zones import AthleteZones
+from app.core.config import settings
+from app.core.profiling import ProfiledRoute
+from app.services.athlete import get_athlete_zones, resolve_athlete_id
+from app.services.strava_client import StravaApiClient
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def get_access_token(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+) -> str:
+    """Extract access token from cookie or Authorization header."""
+    if access_token:
+        return access_token
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
+    return authorization[7:]
+
+
+@router.get("/zones", response_model=AthleteZones)
+async def get_zones(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    refresh: bool = Query(False, description="Bypass the cache and fetch zones from Strava"),
+):
+    """
+    Get heart rate and power zones.
+    Cached per athlete until refreshed or updated via webhook.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        return await get_athlete_zones(client, athlete_id, refresh=refresh)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException, Response, Cookie, Header
 from fastapi.responses import RedirectResponse
 
 from app.core.config import settings
+from app.core.profiling import ProfiledRoute
 from app.models.auth import (
     TokenResponse,
     AuthStatus,
@@ -17,7 +18,7 @@ from app.models.auth import (
 from app.services.strava_auth import StravaAuthService
 from app.services.strava_client import StravaApiClient
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 strava_auth = StravaAuthService()
 
 
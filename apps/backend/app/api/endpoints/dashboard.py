@@ -0,0 +1,92 @@
+"""Dashboard endpoint."""
+
+import asyncio
+from datetime import date
+from typing import List
+from fastapi import APIRouter, Header, HTTPException, Cookie, Query
+
+from app.models.activity import SUMMARY_GETTERS, ActivitySummary
+from app.models.dashboard import Dashboard
+from app.core.config import settings
+from app.core.profiling import ProfiledRoute
+from app.services.athlete import cached_athlete_id, get_athlete_profile
+from app.services.dashboard import (
+    athlete_from_strava,
+    dashboard_stats_from_strava,
+    optional_part,
+    period_totals,
+)
+from app.services.strava_client import StravaApiClient
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def get_access_token(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+) -> str:
+    """Extract access token from cookie or Authorization header."""
+    if access_token:
+        return access_token
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
+    return authorization[7:]
+
+
+@router.get("", response_model=Dashboard)
+async def get_dashboard(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    recent: int = Query(settings.DASHBOARD_RECENT_ACTIVITIES, ge=1, le=100, description="Number of recent activities"),
+):
+    """
+    Get profile, stats, recent activities and totals in one round trip.
+    Upstream calls overlap; optional parts that time out are left out and listed in `missing`.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+    timeout = settings.DASHBOARD_PART_TIMEOUT_SECONDS
+    missing: List[str] = []
+
+    try:
+        known_id = cached_athlete_id(client)
+        profile = asyncio.ensure_future(get_athlete_profile(client))
+
+        async def athlete_id() -> int:
+            # Without a cached ID, wait for the profile request already in flight
+            athlete_id = known_id or (await asyncio.shield(profile)).get("id")
+            if not athlete_id:
+                raise ValueError("Could not determine athlete ID")
+            return athlete_id
+
+        async def load_stats():
+            return dashboard_stats_from_strava(await client.get_athlete_stats(await athlete_id()))
+
+        async def load_recent():
+            activities = await client.get_activities(per_page=recent)
+            return [ActivitySummary(**{name: get(a) for name, get in SUMMARY_GETTERS.items()}) for a in activities]
+
+        async def load_totals():
+            return period_totals(await athlete_id(), date.today())
+
+        parts = [
+            asyncio.ensure_future(optional_part("stats", load_stats(), timeout, missing)),
+            asyncio.ensure_future(optional_part("recent_activities", load_recent(), timeout, missing)),
+            asyncio.ensure_future(optional_part("totals", load_totals(), timeout, missing)),
+        ]
+        try:
+            athlete, stats, recent_activities, totals = await asyncio.gather(profile, *parts)
+        except Exception:
+            # No response without the profile: stop spending quota on the rest
+            for part in parts:
+                part.cancel()
+            raise
+        return Dashboard(
+            athlete=athlete_from_strava(athlete),
+            stats=stats,
+            recent_activities=recent_activities,
+            totals=totals,
+            missing=missing,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
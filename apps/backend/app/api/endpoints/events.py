@@ -0,0 +1,72 @@
+"""Live event stream endpoint (Server-Sent Events)."""
+
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Header, Cookie, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.profiling import ProfiledRoute
+from app.services.athlete import resolve_athlete_id
+from app.services.events import event_bus, format_sse
+from app.services.strava_client import StravaApiClient
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def get_access_token(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+) -> str:
+    """Extract access token from cookie or Authorization header."""
+    if access_token:
+        return access_token
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
+    return authorization[7:]
+
+
+async def _stream(request: Request, athlete_id: int) -> AsyncIterator[str]:
+    # Subscribed on first iteration, so a client gone before the response
+    # starts leaves no subscription behind
+    subscription = event_bus.subscribe(athlete_id)
+    try:
+        yield format_sse("ready", {"athlete_id": athlete_id})
+        while not await request.is_disconnected():
+            try:
+                event, data = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing the idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event, data)
+    finally:
+        event_bus.unsubscribe(subscription)
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+):
+    """
+    Subscribe to live updates for the authenticated athlete.
+    Streams `sync`, `activity` and `rollup` events as Server-Sent Events.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        _stream(request, athlete_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,72 @@
+"""Gear endpoints."""
+
+from typing import Optional
+
+from fastapi import APIRouter, Query, HTTPException, Header, Cookie
+
+from app.models.gear import GearList, GearMileage
+from app.core.config import settings
+from app.core.profiling import ProfiledRoute
+from app.services.athlete import get_gear_metadata, resolve_athlete_id
+from app.services.gear_index import gear_index
+from app.services.strava_client import StravaApiClient
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def get_access_token(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+) -> str:
+    """Extract access token from cookie or Authorization header."""
+    if access_token:
+        return access_token
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
+    return authorization[7:]
+
+
+@router.get("", response_model=GearList)
+async def list_gear(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    alert_km: Optional[float] = Query(None, gt=0, description="Shoe replacement distance (default from settings)"),
+    include_retired: bool = Query(False, description="Include retired gear"),
+):
+    """
+    Get cumulative distance, time and activity count per gear.
+    Totals come from synced activities; names from cached Strava gear.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+    threshold = alert_km or settings.GEAR_SHOE_ALERT_KM
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        totals = gear_index.totals(athlete_id)
+        metadata = await get_gear_metadata(client, athlete_id, [t["gear_id"] for t in totals])
+
+        gear = []
+        for t in totals:
+            meta = metadata.get(t["gear_id"], {})
+            kind = "bike" if t["gear_id"].startswith("b") else "shoe"
+            retired = bool(meta.get("retired"))
+            if retired and not include_retired:
+                continue
+            gear.append(GearMileage(
+                id=t["gear_id"],
+                kind=kind,
+                name=meta.get("name") or meta.get("nickname"),
+                brand_name=meta.get("brand_name"),
+                model_name=meta.get("model_name"),
+                primary=bool(meta.get("primary")),
+                retired=retired,
+                distance=round(t["distance"], 1),
+                moving_time=int(t["moving_time"]),
+                elevation_gain=round(t["elevation_gain"], 1),
+                activity_count=t["activity_count"],
+                alert=kind == "shoe" and not retired and t["distance"] >= threshold * 1000,
+            ))
+        return GearList(alert_km=threshold, gear=gear)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -2,7 +2,12 @@
 
 from fastapi import APIRouter
 
-router = APIRouter()
+from app.core.profiling import ProfiledRoute
+from app.services.activity_index import activity_index
+from app.services.compute import compute_executor
+from app.services.strava_client import quota_scheduler
+
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("")
@@ -16,3 +21,30 @@ async def health_check():
         "service": "StraRun API",
         "version": "0.1.0",
     }
+
+
+@router.get("/quota")
+async def quota_status():
+    """
+    Strava quota scheduler status.
+    Returns usage, queue depth and wait times per priority class.
+    """
+    return quota_scheduler.stats()
+
+
+@router.get("/compute")
+async def compute_status():
+    """
+    Compute executor status.
+    Returns queue depth, running jobs and outcome counters.
+    """
+    return compute_executor.stats()
+
+
+@router.get("/activity-index")
+async def activity_index_status():
+    """
+    In-memory activity index status.
+    Returns athletes held, memory used against the budget and evictions.
+    """
+    return activity_index.stats()
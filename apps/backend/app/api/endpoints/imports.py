@@ -0,0 +1,56 @@
+"""Archive import endpoints."""
+
+import asyncio
+import shutil
+import tempfile
+import zipfile
+
+from fastapi import APIRouter, Query, HTTPException, Header, Cookie, File, UploadFile
+
+from app.models.activity import ImportResult
+from app.core.config import settings
+from app.core.profiling import ProfiledRoute
+from app.services.athlete import resolve_athlete_id
+from app.services.importer import archive_importer
+from app.services.strava_client import StravaApiClient
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def get_access_token(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+) -> str:
+    """Extract access token from cookie or Authorization header."""
+    if access_token:
+        return access_token
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
+    return authorization[7:]
+
+
+@router.post("", response_model=ImportResult)
+async def import_archive(
+    archive: UploadFile = File(..., description="Strava account export zip"),
+    overwrite: bool = Query(False, description="Replace activities that are already stored"),
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+):
+    """
+    Import a Strava account export archive.
+    Seeds activities and streams locally without spending API quota.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        with tempfile.NamedTemporaryFile(suffix=".zip") as copy:
+            # Worker processes open the archive by path
+            await asyncio.to_thread(shutil.copyfileobj, archive.file, copy, 1024 * 1024)
+            copy.flush()
+            return await archive_importer.import_archive(athlete_id, copy.name, overwrite=overwrite)
+    except (zipfile.BadZipFile, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,34 @@
+"""Profile download endpoint."""
+
+import secrets
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.core.config import settings
+from app.core.profiling import profiles
+
+router = APIRouter()
+
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str, request: Request):
+    """
+    Download the profile captured for a profiled request.
+    Requires the same profiling header and secret.
+    """
+    provided = request.headers.get(settings.PROFILING_HEADER, "")
+    if not settings.PROFILING_SECRET or not secrets.compare_digest(
+        provided.encode(), settings.PROFILING_SECRET.encode()
+    ):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    profile = profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    media_type, body = profile
+    extension = "html" if media_type == "text/html" else "txt"
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.{extension}"'},
+    )
@@ -0,0 +1,154 @@
+"""Segments endpoints."""
+
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Query, HTTPException, Header, Cookie
+
+from app.models.segment import SegmentDetail, SegmentEffort, SegmentEfforts, SegmentSummary
+from app.core.config import settings
+from app.core.profiling import ProfiledRoute
+from app.services.athlete import resolve_athlete_id
+from app.services.cache import TTLCache
+from app.services.segment_index import segment_index
+from app.services.strava_client import StravaApiClient
+
+router = APIRouter(route_class=ProfiledRoute)
+
+# Segment geometry rarely changes. Public segments are shared by every athlete
+# (keyed by ID); private segments are keyed by (athlete ID, segment ID).
+segment_cache = TTLCache(ttl_seconds=settings.SEGMENT_CACHE_TTL_SECONDS, max_entries=10_000)
+starred_cache = TTLCache(ttl_seconds=settings.STARRED_SEGMENTS_CACHE_TTL_SECONDS, max_entries=5_000)
+
+
+def get_access_token(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+) -> str:
+    """Extract access token from cookie or Authorization header."""
+    if access_token:
+        return access_token
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
+    return authorization[7:]
+
+
+def _segment_summary(s: Dict[str, Any]) -> SegmentSummary:
+    return SegmentSummary(
+        id=s["id"],
+        name=s.get("name", "Untitled"),
+        activity_type=s.get("activity_type", "Unknown"),
+        distance=s.get("distance", 0.0),
+        average_grade=s.get("average_grade", 0.0),
+        maximum_grade=s.get("maximum_grade", 0.0),
+        elevation_high=s.get("elevation_high"),
+        elevation_low=s.get("elevation_low"),
+        climb_category=s.get("climb_category"),
+        start_latlng=s.get("start_latlng") or None,
+        end_latlng=s.get("end_latlng") or None,
+        city=s.get("city"),
+        state=s.get("state"),
+        country=s.get("country"),
+    )
+
+
+@router.get("/starred", response_model=List[SegmentSummary])
+async def get_starred_segments(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(30, ge=1, le=100, description="Items per page"),
+):
+    """
+    Get the athlete's starred segments.
+    Returns paginated list of segment summaries.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+
+        async def load() -> List[SegmentSummary]:
+            segments = await client.get_starred_segments(page=page, per_page=per_page)
+            return [_segment_summary(s) for s in segments]
+
+        return await starred_cache.get_or_load((athlete_id, page, per_page), load)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{segment_id}", response_model=SegmentDetail)
+async def get_segment(
+    segment_id: int,
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+):
+    """
+    Get segment details by ID.
+    Public segments are served from the shared segment cache; private ones
+    are cached for their owner only.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        # Authenticates the token even when the segment is cached
+        athlete_id = await resolve_athlete_id(client)
+        cached = segment_cache.get(segment_id) or segment_cache.get((athlete_id, segment_id))
+        if cached is not None:
+            return cached
+
+        s = await client.get_segment(segment_id)
+        detail = SegmentDetail(
+            **_segment_summary(s).model_dump(),
+            total_elevation_gain=s.get("total_elevation_gain"),
+            map_polyline=(s.get("map") or {}).get("polyline"),
+            effort_count=s.get("effort_count"),
+            athlete_count=s.get("athlete_count"),
+        )
+        segment_cache.set((athlete_id, segment_id) if s.get("private") else segment_id, detail)
+        return detail
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{segment_id}/efforts", response_model=SegmentEfforts)
+async def get_segment_efforts(
+    segment_id: int,
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    after: Optional[str] = Query(None, description="ISO 8601 datetime - efforts on or after this time"),
+    before: Optional[str] = Query(None, description="ISO 8601 datetime - efforts before this time"),
+    limit: int = Query(200, ge=1, le=1000, description="Maximum number of efforts"),
+):
+    """
+    Get the athlete's efforts on a segment over time.
+    Served from the local effort index populated by activity sync.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        rows = segment_index.efforts_for_segment(
+            athlete_id, segment_id, after=after, before=before, limit=limit
+        )
+        return SegmentEfforts(
+            segment_id=segment_id,
+            efforts=[
+                SegmentEffort(
+                    id=r["id"],
+                    activity_id=r["activity_id"],
+                    name=r["name"],
+                    start_date=r["start_date"],
+                    elapsed_time=r["elapsed_time"],
+                    moving_time=r["moving_time"],
+                    distance=r["distance"],
+                    average_heartrate=r["average_heartrate"],
+                    average_watts=r["average_watts"],
+                    pr_rank=r["pr_rank"],
+                )
+                for r in rows
+            ],
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
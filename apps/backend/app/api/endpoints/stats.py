@@ -1,18 +1,35 @@
 """Statistics endpoints."""
 
-from typing import Optional
-from fastapi import APIRouter, Header, HTTPException, Cookie
+import calendar
+from datetime import date, timedelta
+from typing import Literal, Optional
+from fastapi import APIRouter, Header, HTTPException, Cookie, Query
 
 from app.models.stats import (
     DashboardStats,
     WeeklyStats,
     MonthlyStats,
     ActivityTypeStats,
+    CalendarHeatmap,
+    ActivityTotals,
+    PeriodComparison,
+    PeriodCurve,
+    PersonalRecords,
+    RecordEntry,
 )
+from app.models.zones import ZoneDistribution
 from app.core.config import settings
+from app.core.profiling import ProfiledRoute
+from app.core.dates import to_epoch
+from app.services.activity_index import activity_index
+from app.services.athlete import resolve_athlete_id
+from app.services.dashboard import dashboard_stats_from_strava, type_totals
+from app.services.records import ACTIVITY_METRICS, records_index
+from app.services.rollups import METRICS, CumulativeSeries, daily_rollups, prefix_sums
 from app.services.strava_client import StravaApiClient
+from app.services.zone_index import zone_index
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 def get_access_token(
@@ -27,6 +44,196 @@ def get_access_token(
     return authorization[7:]
 
 
+def _compact(values) -> list:
+    """Round for the wire and drop the float suffix of whole numbers."""
+    rounded = (round(v, 1) for v in values)
+    return [int(v) if v.is_integer() else v for v in rounded]
+
+
+@router.get("/calendar", response_model=CalendarHeatmap)
+async def get_calendar(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    year: int = Query(default_factory=lambda: date.today().year, ge=2000, le=2100, description="Calendar year"),
+    activity_type: Optional[str] = Query(None, description="Filter by activity type (Run, Ride, etc.)"),
+):
+    """
+    Get per-day totals for a training calendar heatmap.
+    Served from the precomputed daily rollup of synced activities.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        rollup = daily_rollups.year(athlete_id, year)
+        return CalendarHeatmap(
+            year=year,
+            days=rollup.days,
+            metrics=list(METRICS),
+            types={
+                t: {m: _compact(columns[m]) for m in METRICS}
+                for t, columns in rollup.types.items()
+                if not activity_type or t == activity_type
+            },
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _period_bounds(period: str, day: date) -> tuple[date, date]:
+    """First and last day of the year or month containing ``day``."""
+    if period == "year":
+        return date(day.year, 1, 1), date(day.year, 12, 31)
+    last = calendar.monthrange(day.year, day.month)[1]
+    return date(day.year, day.month, 1), date(day.year, day.month, last)
+
+
+def _one_year_earlier(day: date) -> date:
+    # Feb 29 maps to Feb 28
+    return day.replace(year=day.year - 1, day=min(day.day, calendar.monthrange(day.year - 1, day.month)[1]))
+
+
+def _period_curve(series: Optional[CumulativeSeries], start: date, end: date) -> PeriodCurve:
+    days = (end - start).days + 1
+    if series is None:
+        cumulative = {m: [0.0] * days for m in METRICS}
+    else:
+        cumulative = series.curve(start, end)
+    return PeriodCurve(
+        start_date=start.isoformat(),
+        days=days,
+        totals={m: round(values[-1], 1) for m, values in cumulative.items()},
+        cumulative={m: _compact(values) for m, values in cumulative.items()},
+    )
+
+
+@router.get("/compare", response_model=PeriodComparison)
+async def compare_periods(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    period: Literal["year", "month"] = Query("year", description="Period to compare"),
+    activity_type: Optional[str] = Query(None, description="Filter by activity type (Run, Ride, etc.)"),
+    on: Optional[date] = Query(None, description="Reference day (YYYY-MM-DD), defaults to today"),
+):
+    """
+    Compare this period to date with the same period last year.
+    Served from per-athlete cumulative prefix-sum arrays.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        series = prefix_sums.series(athlete_id, activity_type)
+
+        reference = on or date.today()
+        start, _ = _period_bounds(period, reference)
+        previous_reference = _one_year_earlier(reference)
+        previous_start, previous_end = _period_bounds(period, previous_reference)
+
+        current = _period_curve(series, start, reference)
+        if series is None:
+            previous_to_date = {m: 0.0 for m in METRICS}
+        else:
+            through = series.total_through(previous_reference)
+            before = series.total_through(previous_start - timedelta(days=1))
+            previous_to_date = {m: round(through[m] - before[m], 1) for m in METRICS}
+
+        return PeriodComparison(
+            period=period,
+            activity_type=activity_type,
+            reference_date=reference.isoformat(),
+            current=current,
+            previous=_period_curve(series, previous_start, previous_end),
+            previous_to_date=previous_to_date,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/records", response_model=PersonalRecords)
+async def get_personal_records(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    activity_type: Optional[str] = Query(None, description="Filter by activity type (Run, Ride, etc.)"),
+):
+    """
+    Get personal records per sport type.
+    Served from the incrementally maintained top-k record index.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        athlete = records_index.records(athlete_id)
+        types: dict = {}
+        for (record_type, metric), top in sorted(athlete.top.items()):
+            if activity_type and record_type != activity_type:
+                continue
+            entries = []
+            for rank, (_, score, meta) in enumerate(top.ranked(), start=1):
+                higher_is_better = ACTIVITY_METRICS.get(metric, (None, True))[1]
+                entries.append(RecordEntry(rank=rank, value=score if higher_is_better else -score, **meta))
+            if entries:
+                types.setdefault(record_type, {})[metric] = entries
+        return PersonalRecords(types=types)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/zones", response_model=ZoneDistribution)
+async def get_zone_distribution(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    after: Optional[str] = Query(None, alias="from", description="ISO 8601 date - range start (inclusive)"),
+    before: Optional[str] = Query(None, alias="to", description="ISO 8601 date - range end (exclusive)"),
+):
+    """
+    Get time in heart rate and power zones over a date range.
+    Sums the cached per-activity zone histograms of synced activities.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        totals = zone_index.distribution(athlete_id, after=after, before=before)
+        return ZoneDistribution(after=after, before=before, **totals)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/totals", response_model=ActivityTotals)
+async def get_activity_totals(
+    authorization: str | None = Header(None),
+    access_token: str | None = Cookie(None, alias=settings.ACCESS_TOKEN_COOKIE_NAME),
+    after: Optional[str] = Query(None, alias="from", description="ISO 8601 date - range start (inclusive)"),
+    before: Optional[str] = Query(None, alias="to", description="ISO 8601 date - range end (exclusive)"),
+    activity_type: Optional[str] = Query(None, description="Filter by activity type (Run, Ride, etc.)"),
+):
+    """
+    Get totals per activity type over a date range.
+    Aggregated from the in-memory activity index of synced activities.
+    """
+    token = get_access_token(authorization, access_token)
+    client = StravaApiClient(token)
+
+    try:
+        athlete_id = await resolve_athlete_id(client)
+        totals = activity_index.athlete(athlete_id).totals(
+            after=to_epoch(after) if after else None,
+            before=to_epoch(before) if before else None,
+            activity_type=activity_type,
+        )
+        return ActivityTotals(after=after, before=before, types=type_totals(totals))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{athlete_id}")
 async def get_athlete_stats(
     athlete_id: int,
@@ -60,29 +267,8 @@ async def get_dashboard_stats(
     client = StravaApiClient(token)
     
     try:
-        # Get athlete to find ID
-        athlete = await client.get_athlete()
-        athlete_id = athlete.get("id")
-        
-        if not athlete_id:
-            raise HTTPException(status_code=400, detail="Could not determine athlete ID")
-        
-        stats = await client.get_athlete_stats(athlete_id)
-        
-        run_ytd = stats.get("ytd_run_totals", {})
-        ride_ytd = stats.get("ytd_ride_totals", {})
-        run_recent = stats.get("recent_run_totals", {})
-        ride_recent = stats.get("recent_ride_totals", {})
-        
-        return DashboardStats(
-            total_activities=run_ytd.get("count", 0) + ride_ytd.get("count", 0),
-            total_distance=(run_ytd.get("distance", 0) + ride_ytd.get("distance", 0)) / 1000,
-            total_time=run_ytd.get("moving_time", 0) + ride_ytd.get("moving_time", 0),
-            total_elevation=run_ytd.get("elevation_gain", 0) + ride_ytd.get("elevation_gain", 0),
-            this_week_activities=run_recent.get("count", 0) + ride_recent.get("count", 0),
-            this_week_distance=(run_recent.get("distance", 0) + ride_recent.get("distance", 0)) / 1000,
-            this_month_activities=0,
-            this_month_distance=0,
-        )
+        # Cached per token, so only the stats request usually reaches Strava
+        athlete_id = await resolve_athlete_id(client)
+        return dashboard_stats_from_strava(await client.get_athlete_stats(athlete_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,65 @@
+"""Strava push subscription (webhook) endpoints."""
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.core.config import settings
+from app.core.profiling import ProfiledRoute
+from app.models.webhook import StravaWebhookEvent
+from app.services.activity_store import activity_store
+from app.services.athlete import invalidate_athlete
+
+# Strava webhook update keys -> stored activity fields
+_ACTIVITY_UPDATE_FIELDS = {"title": "name", "type": "type", "sport_type": "sport_type"}
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.get("/strava")
+async def verify_subscription(
+    mode: str = Query(..., alias="hub.mode"),
+    verify_token: str = Query(..., alias="hub.verify_token"),
+    challenge: str = Query(..., alias="hub.challenge"),
+):
+    """
+    Validate a Strava push subscription.
+    Echoes the challenge when the verify token matches.
+    """
+    if (
+        mode != "subscribe"
+        or not settings.STRAVA_WEBHOOK_VERIFY_TOKEN
+        or verify_token != settings.STRAVA_WEBHOOK_VERIFY_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="Invalid verify token")
+    return {"hub.challenge": challenge}
+
+
+@router.post("/strava")
+async def receive_event(event: StravaWebhookEvent):
+    """
+    Receive a Strava push event.
+    Must answer quickly; only cheap local cache updates happen here.
+    """
+    subscription_id = settings.STRAVA_WEBHOOK_SUBSCRIPTION_ID
+    if not subscription_id or event.subscription_id != subscription_id:
+        raise HTTPException(status_code=403, detail="Unknown subscription")
+
+    if event.object_type == "athlete" and event.aspect_type == "update":
+        invalidate_athlete(event.owner_id)
+    elif event.object_type == "activity":
+        # Creates need an athlete token to fetch; they are picked up by the next
+        # sync. Otherwise only an activity stored for the event's owner may change.
+        if activity_store.get(event.object_id, athlete_id=event.owner_id) is None:
+            return {"status": "ok"}
+        if event.aspect_type == "delete":
+            activity_store.delete(event.object_id)
+        elif event.aspect_type == "update" and event.updates:
+            changes = {
+                field: event.updates[key]
+                for key, field in _ACTIVITY_UPDATE_FIELDS.items()
+                if key in event.updates
+            }
+            if "private" in event.updates:
+                changes["private"] = str(event.updates["private"]).lower() == "true"
+            if changes:
+                activity_store.update_fields(event.object_id, changes)
+    return {"status": "ok"}
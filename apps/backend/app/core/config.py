@@ -14,6 +14,10 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     SECRET_KEY: str = "change-this-in-production"
 
+    # Per-request profiling: send PROFILING_HEADER with this secret (empty disables)
+    PROFILING_SECRET: str = ""
+    PROFILING_HEADER: str = "X-Profile"
+
     # CORS
     CORS_ORIGINS: List[str] = [
         "http://localhost:4200",
@@ -24,6 +28,14 @@ class Settings(BaseSettings):
     STRAVA_CLIENT_ID: str = ""
     STRAVA_CLIENT_SECRET: str = ""
     STRAVA_REDIRECT_URI: str = "http://localhost:4200/auth/callback"
+    STRAVA_WEBHOOK_VERIFY_TOKEN: str = ""
+    STRAVA_WEBHOOK_SUBSCRIPTION_ID: int = 0  # Required for webhooks: events from any other subscription are rejected; 0 rejects all
+
+    # Strava quota (shared by the whole application)
+    STRAVA_RATE_LIMIT_15MIN: int = 100
+    STRAVA_RATE_LIMIT_DAY: int = 1000
+    STRAVA_INTERACTIVE_RESERVE_15MIN: int = 20  # Never used by background requests
+    STRAVA_INTERACTIVE_RESERVE_DAY: int = 200
 
     # Auth cookies
     ACCESS_TOKEN_COOKIE_NAME: str = "strava_access_token"
@@ -32,9 +44,57 @@ class Settings(BaseSettings):
     COOKIE_SECURE: bool = False  # Set to True in production with HTTPS
     REFRESH_COOKIE_MAX_AGE_DAYS: int = 30
 
-    # Database (for future use)
+    # Local storage for synced activities and indexes
     DATABASE_URL: str = "sqlite:///./strarun.db"
 
+    # Caching (seconds)
+    ATHLETE_CACHE_TTL_SECONDS: int = 3600
+    SEGMENT_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60  # Segment geometry rarely changes
+    STARRED_SEGMENTS_CACHE_TTL_SECONDS: int = 300
+    ZONES_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60  # Invalidated by athlete update webhooks
+    GEAR_CACHE_TTL_SECONDS: int = 24 * 60 * 60  # Names and retired flags; mileage is computed locally
+
+    # In-memory rollups
+    ROLLUP_CACHE_MEMORY_MB: float = 64.0  # Budget for daily rollup arrays; LRU (athlete, year) pairs evicted beyond it
+    PREFIX_SUMS_MAX_ATHLETES: int = 500  # Athletes with cumulative series in memory
+    RECORDS_TOP_K: int = 3  # Entries kept per record metric and sport type
+    RECORDS_MAX_ATHLETES: int = 2000  # Athletes with record heaps in memory
+    ACTIVITY_INDEX_MEMORY_MB: float = 64.0  # Budget for in-memory activity columns; LRU athletes evicted beyond it
+
+    # Live events (Server-Sent Events)
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+    EVENTS_MAX_QUEUE: int = 100  # Per connection; oldest events dropped when full
+
+    # Gear
+    GEAR_SHOE_ALERT_KM: float = 700.0  # Default distance at which shoes are flagged for replacement
+
+    # Repeated-route detection
+    ROUTE_CELL_METERS: float = 250.0  # Grid cell size for start/end buckets; caps the match threshold
+    ROUTE_TRACK_POINTS: int = 48  # Points per resampled track compared with Fréchet distance
+    ROUTE_MATCH_METERS: float = 120.0  # Default Fréchet distance counted as the same route
+
+    # Stream cache and exports
+    STREAM_CACHE_MAX_ACTIVITIES: int = 2000  # Activities whose streams are kept locally
+    STREAM_CACHE_PRUNE_EVERY: int = 50  # Saves between trims back to the limit
+    EXPORT_CHUNK_POINTS: int = 1000  # Track points rendered per streamed GPX/TCX chunk
+
+    # Compute executor (process pool for CPU-bound jobs)
+    COMPUTE_WORKERS: int = 0  # Worker processes; 0 uses every CPU core
+    COMPUTE_JOB_TIMEOUT_SECONDS: float = 30.0  # Default execution time limit per job
+    COMPUTE_QUEUE_TIMEOUT_SECONDS: float = 60.0  # Extra time a job may wait for a free worker
+
+    # Strava export archive import
+    IMPORT_FILE_TIMEOUT_SECONDS: float = 120.0  # Parse time limit per activity file
+    IMPORT_BATCH_SIZE: int = 25  # Activities written per transaction (blocks the event loop while it runs)
+
+    # Dashboard
+    DASHBOARD_PART_TIMEOUT_SECONDS: float = 3.0  # Optional parts slower than this are left out of the response
+    DASHBOARD_RECENT_ACTIVITIES: int = 10  # Default number of recent activities
+
+    # Sync
+    SYNC_MAX_ACTIVITIES: int = 50  # Detail requests per sync run
+    SYNC_ZONE_HISTOGRAMS: bool = True  # One extra request per HR/power activity
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,109 @@
+"""
+SQLite storage shared by the local indexes.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Set
+
+from app.core.config import settings
+
+
+def _database_path(url: str) -> str:
+    """Convert a ``sqlite:///`` URL into a filesystem path."""
+    prefix = "sqlite:///"
+    if not url.startswith(prefix):
+        raise ValueError(f"Unsupported DATABASE_URL: {url}")
+    return url[len(prefix):] or ":memory:"
+
+
+class Database:
+    """Thread-safe wrapper around a single SQLite connection."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._schemas: Set[str] = set()
+        self._depth = 0
+        self._after_commit: List[Callable[[], None]] = []
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    conn = sqlite3.connect(_database_path(self.url), check_same_thread=False)
+                    conn.row_factory = sqlite3.Row
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    self._conn = conn
+        return self._conn
+
+    def ensure_schema(self, name: str, script: str) -> None:
+        """
+        Run a CREATE ... IF NOT EXISTS script once per process.
+
+        Statements are executed one by one because executescript() would
+        commit a write transaction the caller (e.g. a store listener) has open.
+        Such a script only counts as run once that transaction commits.
+        """
+        if name in self._schemas:
+            return
+        with self._lock:
+            if name not in self._schemas:
+                for statement in script.split(";"):
+                    if statement.strip():
+                        self.connection.execute(statement)
+                self.on_commit(lambda: self._schemas.add(name))
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Hold the connection lock and commit (or roll back) on exit.
+
+        Nested transactions join the outermost one.
+        """
+        callbacks: List[Callable[[], None]] = []
+        with self._lock:
+            conn = self.connection
+            self._depth += 1
+            try:
+                yield conn
+            except Exception:
+                if self._depth == 1:
+                    conn.rollback()
+                    self._after_commit.clear()
+                raise
+            else:
+                if self._depth == 1:
+                    conn.commit()
+                    callbacks, self._after_commit = self._after_commit, []
+            finally:
+                self._depth -= 1
+        for callback in callbacks:
+            callback()
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run ``callback`` once the current transaction commits (now if none is open).
+
+        Callbacks of a transaction that rolls back are dropped.
+        """
+        with self._lock:
+            if self._depth:
+                self._after_commit.append(callback)
+                return
+        callback()
+
+    def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self.connection.execute(sql, params).fetchone()
+
+
+db = Database(settings.DATABASE_URL)
@@ -0,0 +1,18 @@
+"""
+Helpers for Strava ISO 8601 timestamps.
+"""
+
+from datetime import datetime, timezone
+
+
+def parse_strava_datetime(value: str) -> datetime:
+    """Parse a Strava timestamp such as ``2024-01-15T08:00:00Z`` (UTC-aware)."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def to_epoch(value: str) -> int:
+    """Convert a Strava timestamp into a Unix epoch in seconds."""
+    return int(parse_strava_datetime(value).timestamp())
@@ -0,0 +1,200 @@
+"""
+Opt-in per-request profiling.
+
+A request that sends the ``PROFILING_HEADER`` with ``PROFILING_SECRET`` gets a
+``Server-Timing`` header breaking its time into quota wait, upstream calls,
+handler code, response validation and JSON serialization, plus an
+``X-Profile-Id`` pointing at a stored sampling profile (one profiled request
+at a time; overlapping ones get Server-Timing only). Other requests only
+pay for one header lookup and one context variable read per span.
+"""
+
+import cProfile
+import functools
+import inspect
+import io
+import pstats
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.services.cache import TTLCache
+
+try:  # Optional: statistical profiler with async awareness
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # pragma: no cover - depends on installed extras
+    SamplingProfiler = None
+
+# Finished profiles, downloadable for a few minutes
+profiles = TTLCache(ttl_seconds=600, max_entries=50)
+
+
+class RequestProfile:
+    """Span durations (seconds) and call counts for one profiled request."""
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, name: str, duration: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + duration
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def server_timing(self, total: float) -> str:
+        d = self.durations
+        quota = d.get("quota", 0.0)
+        upstream = d.get("upstream", 0.0)
+        serialization = d.get("serialization", 0.0)
+        handler = d.get("handler", 0.0)
+        entries = [
+            ("quota", quota, None),
+            ("upstream", upstream, f"{self.counts.get('upstream', 0)} calls"),
+            # Handler self time: model construction and other endpoint code
+            ("handler", max(handler - quota - upstream, 0.0), None),
+            # Route time outside the endpoint and renderer: response_model validation
+            ("validation", max(d.get("route", 0.0) - handler - serialization, 0.0), None),
+            ("serialization", serialization, None),
+            ("total", total, None),
+        ]
+        return ", ".join(
+            f'{name};dur={value * 1000:.2f}' + (f';desc="{desc}"' if desc else "")
+            for name, value, desc in entries
+        )
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block into the current request profile, if one is active."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - start)
+
+
+def _profiling_requested(scope: Scope) -> bool:
+    if not settings.PROFILING_SECRET:
+        return False
+    header = settings.PROFILING_HEADER.lower().encode()
+    for key, value in scope.get("headers", ()):
+        if key == header:
+            return secrets.compare_digest(value, settings.PROFILING_SECRET.encode())
+    return False
+
+
+# Only one request is profiled at a time: pyinstrument refuses a second
+# profiler on the event loop thread and cProfile would mix in the other
+# request. Overlapping requests get spans-only Server-Timing.
+_profiler_active = False
+
+
+def _start_profiler() -> Optional[Any]:
+    """Start a profiler, or return None while another request holds it."""
+    global _profiler_active
+    if _profiler_active:
+        return None
+    if SamplingProfiler is not None:
+        profiler = SamplingProfiler(async_mode="enabled")
+        profiler.start()
+    else:
+        # Deterministic fallback; covers the whole thread while active
+        profiler = cProfile.Profile()
+        profiler.enable()
+    _profiler_active = True
+    return profiler
+
+
+def _finish_profiler(profiler: Any) -> Tuple[str, str]:
+    """Stop the profiler and render it as (media type, body)."""
+    global _profiler_active
+    _profiler_active = False
+    if SamplingProfiler is not None and isinstance(profiler, SamplingProfiler):
+        profiler.stop()
+        return "text/html", profiler.output_html()
+    profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(60)
+    return "text/plain", out.getvalue()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware enabling profiling for requests carrying the secret header."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        profiler = _start_profiler()
+        profile_id = secrets.token_urlsafe(12) if profiler is not None else None
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing(time.perf_counter() - start))
+                if profile_id is not None:
+                    headers.append("X-Profile-Id", profile_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if profiler is not None:
+                profiles.set(profile_id, _finish_profiler(profiler))
+
+
+class ProfiledJSONResponse(JSONResponse):
+    """JSONResponse whose encoding is recorded as the ``serialization`` span."""
+
+    def render(self, content: Any) -> bytes:
+        with span("serialization"):
+            return super().render(content)
+
+
+class ProfiledRoute(APIRoute):
+    """
+    APIRoute recording ``route`` (whole FastAPI handling) and ``handler``
+    (endpoint function only) spans, from which validation time is derived.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if inspect.iscoroutinefunction(endpoint):
+            original = endpoint
+
+            @functools.wraps(original)
+            async def endpoint(*args: Any, **kw: Any) -> Any:
+                with span("handler"):
+                    return await original(*args, **kw)
+
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request: Any) -> Any:
+            with span("route"):
+                return await handler(request)
+
+        return profiled_handler
@@ -1,6 +1,6 @@
 """Activity models."""
 
-from typing import Optional, List
+from typing import Any, Callable, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -61,6 +61,40 @@ class ActivityDetail(BaseModel):
     average_cadence: Optional[float] = None
     average_watts: Optional[float] = None
     kilojoules: Optional[float] = None
+    gear_id: Optional[str] = None
+
+
+# Per-field extractors from Strava payloads, so sparse requests only build
+# the columns they ask for
+Getters = Dict[str, Callable[[Dict[str, Any]], Any]]
+
+SUMMARY_GETTERS: Getters = {
+    "id": lambda a: a["id"],
+    "name": lambda a: a.get("name", "Untitled"),
+    "type": lambda a: a.get("type", "Unknown"),
+    "distance": lambda a: a.get("distance", 0.0),
+    "moving_time": lambda a: a.get("moving_time", 0),
+    "elapsed_time": lambda a: a.get("elapsed_time", 0),
+    "total_elevation_gain": lambda a: a.get("total_elevation_gain", 0.0),
+    "start_date": lambda a: a.get("start_date", ""),
+    "average_speed": lambda a: a.get("average_speed", 0.0),
+    "max_speed": lambda a: a.get("max_speed", 0.0),
+}
+
+DETAIL_GETTERS: Getters = {
+    **SUMMARY_GETTERS,
+    "sport_type": lambda a: a.get("sport_type", a.get("type", "Unknown")),
+    "start_date_local": lambda a: a.get("start_date_local", ""),
+    "timezone": lambda a: a.get("timezone", ""),
+    "average_heartrate": lambda a: a.get("average_heartrate"),
+    "max_heartrate": lambda a: a.get("max_heartrate"),
+    "calories": lambda a: a.get("calories"),
+    "description": lambda a: a.get("description"),
+    "average_cadence": lambda a: a.get("average_cadence"),
+    "average_watts": lambda a: a.get("average_watts"),
+    "kilojoules": lambda a: a.get("kilojoules"),
+    "gear_id": lambda a: a.get("gear_id"),
+}
 
 
 class Activity(BaseModel):
@@ -107,3 +141,82 @@ class Activity(BaseModel):
     calories: Optional[float] = None
     description: Optional[str] = None
     gear_id: Optional[str] = None
+
+
+class SyncResult(BaseModel):
+    """Result of an incremental activity sync run."""
+
+    synced: int = Field(description="Activities ingested in this run")
+    complete: bool = Field(description="False if more activities remain to be synced")
+
+
+class ActivitySearchHit(BaseModel):
+    """Single ranked full-text search match."""
+
+    id: int
+    name: str
+    type: str
+    start_date: str = Field(description="ISO 8601 datetime string")
+    distance: float = Field(description="Distance in meters")
+    moving_time: int = Field(description="Moving time in seconds")
+    snippet: Optional[str] = Field(None, description="Matched text with <mark> highlights")
+    score: float = Field(description="bm25 relevance; lower is better")
+
+
+class ActivitySearchResults(BaseModel):
+    """Paginated full-text search results."""
+
+    query: str
+    page: int
+    per_page: int
+    has_more: bool
+    results: List[ActivitySearchHit]
+
+
+class SimilarActivity(BaseModel):
+    """Activity following the same route as another one."""
+
+    id: int
+    name: str
+    type: str
+    start_date: str = Field(description="ISO 8601 datetime string")
+    distance: float = Field(description="Distance in meters")
+    moving_time: int = Field(description="Moving time in seconds")
+    elapsed_time: int = Field(description="Elapsed time in seconds")
+    average_speed: float = Field(description="Average speed in m/s")
+    frechet_distance: float = Field(description="Fréchet distance between the tracks in meters")
+
+
+class SimilarActivities(BaseModel):
+    """Previous and later runs of an activity's route, closest track first."""
+
+    activity_id: int
+    max_distance: float = Field(description="Fréchet distance threshold used, in meters")
+    results: List[SimilarActivity]
+
+
+class ImportResult(BaseModel):
+    """Result of a Strava export archive import."""
+
+    imported: int = Field(description="Activities written to local storage")
+    with_streams: int = Field(description="Imported activities with streams parsed from their file")
+    skipped: int = Field(description="Rows already stored or without an ID and date")
+    errors: List[str] = Field(default_factory=list, description="Files that could not be parsed (first 50)")
+
+
+class StreamBestEffort(BaseModel):
+    """Fastest stretch of an activity covering a standard distance."""
+
+    name: str
+    target_distance: float = Field(description="Target distance in meters")
+    elapsed_time: int = Field(description="Seconds taken over the fastest stretch")
+    distance: float = Field(description="Distance actually covered by the stretch in meters")
+    start_index: int = Field(description="Index of the first stream point")
+    end_index: int = Field(description="Index of the last stream point")
+
+
+class StreamBestEfforts(BaseModel):
+    """Best efforts computed from an activity's streams."""
+
+    activity_id: int
+    efforts: List[StreamBestEffort]
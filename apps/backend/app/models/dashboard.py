@@ -0,0 +1,57 @@
+"""Composed dashboard models."""
+
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+from app.models.activity import ActivitySummary
+from app.models.auth import StravaAthlete
+from app.models.stats import DashboardStats, TypeTotals
+
+
+class Dashboard(BaseModel):
+    """Everything the dashboard renders, in one response."""
+
+    athlete: StravaAthlete
+    stats: Optional[DashboardStats] = None
+    recent_activities: Optional[List[ActivitySummary]] = None
+    totals: Optional[Dict[str, Dict[str, TypeTotals]]] = Field(
+        None, description="Totals per type of synced activities for 'week' and 'month'"
+    )
+    missing: List[str] = Field(
+        default_factory=list, description="Optional parts left out because they timed out or failed"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "athlete": {"id": 12345, "firstname": "John", "lastname": "Doe"},
+                    "stats": {
+                        "total_activities": 150,
+                        "total_distance": 1250.5,
+                        "total_time": 180000,
+                        "total_elevation": 15000.0,
+                        "this_week_activities": 5,
+                        "this_week_distance": 45.2,
+                        "this_month_activities": 0,
+                        "this_month_distance": 0,
+                    },
+                    "recent_activities": None,
+                    "totals": {
+                        "week": {
+                            "Run": {
+                                "count": 3,
+                                "distance": 24500.0,
+                                "moving_time": 7600,
+                                "elapsed_time": 7900,
+                                "elevation_gain": 210.0,
+                                "max_speed": 5.4,
+                            }
+                        },
+                        "month": {},
+                    },
+                    "missing": ["recent_activities"],
+                }
+            ]
+        }
+    }
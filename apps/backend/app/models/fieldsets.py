@@ -0,0 +1,46 @@
+"""Sparse fieldset support: response models restricted to requested fields."""
+
+from functools import lru_cache
+from typing import FrozenSet, Optional, Type
+
+from pydantic import BaseModel, TypeAdapter, create_model
+
+# Always returned so clients can key results
+REQUIRED_FIELDS = frozenset({"id"})
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a ``fields=a,b,c`` query value against a model.
+
+    Returns:
+        The selected field names, or None when every field is wanted
+
+    Raises:
+        ValueError: If a name is not a field of the model
+    """
+    if not fields:
+        return None
+    selected = frozenset(f.strip() for f in fields.split(",") if f.strip())
+    unknown = selected - model.model_fields.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return selected | (REQUIRED_FIELDS & model.model_fields.keys())
+
+
+@lru_cache(maxsize=256)
+def sparse_model(model: Type[BaseModel], fields: FrozenSet[str]) -> Type[BaseModel]:
+    """Generate (once per field set) a copy of ``model`` with only ``fields``."""
+    definitions = {
+        name: (info.annotation, info)
+        for name, info in model.model_fields.items()
+        if name in fields
+    }
+    suffix = "_".join(sorted(fields))
+    return create_model(f"{model.__name__}__{suffix}", **definitions)
+
+
+@lru_cache(maxsize=256)
+def sparse_list_adapter(model: Type[BaseModel], fields: FrozenSet[str]) -> TypeAdapter:
+    """Cached JSON serializer for a list of sparse models."""
+    return TypeAdapter(list[sparse_model(model, fields)])
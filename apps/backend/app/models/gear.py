@@ -0,0 +1,28 @@
+"""Gear (shoes and bikes) models."""
+
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+
+
+class GearMileage(BaseModel):
+    """Totals of the activities recorded with one piece of gear."""
+
+    id: str
+    kind: Literal["shoe", "bike"]
+    name: Optional[str] = None
+    brand_name: Optional[str] = None
+    model_name: Optional[str] = None
+    primary: bool = False
+    retired: bool = False
+    distance: float = Field(description="Distance in meters over synced activities")
+    moving_time: int = Field(description="Moving time in seconds over synced activities")
+    elevation_gain: float = Field(description="Elevation gain in meters over synced activities")
+    activity_count: int
+    alert: bool = Field(False, description="Active shoe past the replacement distance")
+
+
+class GearList(BaseModel):
+    """Athlete gear with locally aggregated mileage."""
+
+    alert_km: float = Field(description="Shoe replacement distance used for alerts")
+    gear: List[GearMileage]
@@ -0,0 +1,83 @@
+"""Segment models."""
+
+from typing import Optional, List
+from pydantic import BaseModel, Field
+
+
+class SegmentSummary(BaseModel):
+    """Summary model for segment lists."""
+
+    id: int
+    name: str
+    activity_type: str
+    distance: float = Field(description="Distance in meters")
+    average_grade: float = Field(description="Average grade in percent")
+    maximum_grade: float = Field(description="Maximum grade in percent")
+    elevation_high: Optional[float] = None
+    elevation_low: Optional[float] = None
+    climb_category: Optional[int] = None
+    start_latlng: Optional[List[float]] = None
+    end_latlng: Optional[List[float]] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    country: Optional[str] = None
+
+
+class SegmentDetail(SegmentSummary):
+    """
+    Detailed segment model.
+
+    Only athlete-independent fields are included so the model can be cached
+    and shared across users.
+    """
+
+    total_elevation_gain: Optional[float] = None
+    map_polyline: Optional[str] = None
+    effort_count: Optional[int] = None
+    athlete_count: Optional[int] = None
+
+
+class SegmentEffort(BaseModel):
+    """One of the athlete's efforts on a segment."""
+
+    id: int
+    activity_id: int
+    name: str
+    start_date: str = Field(description="ISO 8601 datetime string")
+    elapsed_time: int = Field(description="Elapsed time in seconds")
+    moving_time: int = Field(description="Moving time in seconds")
+    distance: float = Field(description="Distance in meters")
+    average_heartrate: Optional[float] = None
+    average_watts: Optional[float] = None
+    pr_rank: Optional[int] = None
+
+
+class SegmentEfforts(BaseModel):
+    """Efforts of the athlete on a segment over time."""
+
+    segment_id: int
+    efforts: List[SegmentEffort]
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "segment_id": 229781,
+                    "efforts": [
+                        {
+                            "id": 1234567890,
+                            "activity_id": 12345678,
+                            "name": "Hawk Hill",
+                            "start_date": "2024-01-15T08:10:00Z",
+                            "elapsed_time": 420,
+                            "moving_time": 415,
+                            "distance": 2684.8,
+                            "average_heartrate": 162.3,
+                            "average_watts": None,
+                            "pr_rank": 1,
+                        }
+                    ],
+                }
+            ]
+        }
+    }
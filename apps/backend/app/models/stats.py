@@ -1,6 +1,6 @@
 """Statistics models."""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel, Field
 
 
@@ -88,3 +88,154 @@ class ActivityTypeStats(BaseModel):
             ]
         }
     }
+
+
+class CalendarHeatmap(BaseModel):
+    """
+    Per-day totals for one year.
+
+    Each metric is a parallel array with one entry per day starting on
+    January 1st, instead of one object per day.
+    """
+
+    year: int
+    days: int = Field(description="Number of days in the year (365 or 366)")
+    metrics: List[str] = Field(description="Metric names present in each type's arrays")
+    types: Dict[str, Dict[str, List[Union[int, float]]]] = Field(
+        description="Activity type -> metric -> daily values (meters, seconds, meters, count)"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "year": 2024,
+                    "days": 366,
+                    "metrics": ["distance", "moving_time", "elevation_gain", "count"],
+                    "types": {
+                        "Run": {
+                            "distance": [5012.3, 0, 10240.0],
+                            "moving_time": [1800, 0, 3600],
+                            "elevation_gain": [50.0, 0, 120.0],
+                            "count": [1, 0, 1],
+                        }
+                    },
+                }
+            ]
+        }
+    }
+
+
+class PeriodCurve(BaseModel):
+    """Cumulative totals for one period, one entry per day."""
+
+    start_date: str = Field(description="First day of the period (YYYY-MM-DD)")
+    days: int = Field(description="Number of days in the curve")
+    totals: Dict[str, float] = Field(description="Totals over the days in the curve")
+    cumulative: Dict[str, List[Union[int, float]]] = Field(
+        description="Metric -> running total per day (meters, seconds, meters, count)"
+    )
+
+
+class PeriodComparison(BaseModel):
+    """Current period to date vs the same period one year earlier."""
+
+    period: str
+    activity_type: Optional[str] = None
+    reference_date: str = Field(description="Last day of the current curve (YYYY-MM-DD)")
+    current: PeriodCurve
+    previous: PeriodCurve
+    previous_to_date: Dict[str, float] = Field(
+        description="Totals of the previous period up to the same day offset"
+    )
+
+
+class RecordEntry(BaseModel):
+    """One ranked entry of a personal record."""
+
+    rank: int
+    value: float = Field(description="Meters, seconds or meters depending on the metric")
+    activity_id: Optional[int] = None
+    name: Optional[str] = None
+    start_date: Optional[str] = None
+    week_start: Optional[str] = Field(None, description="Monday of the week, for weekly records")
+
+
+class PersonalRecords(BaseModel):
+    """Top entries per record metric, grouped by sport type."""
+
+    types: Dict[str, Dict[str, List[RecordEntry]]]
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "types": {
+                        "Run": {
+                            "longest_distance": [
+                                {
+                                    "rank": 1,
+                                    "value": 42195.0,
+                                    "activity_id": 12345678,
+                                    "name": "City Marathon",
+                                    "start_date": "2024-04-21T07:00:00Z",
+                                }
+                            ],
+                            "fastest_5k": [
+                                {
+                                    "rank": 1,
+                                    "value": 1185,
+                                    "activity_id": 12345001,
+                                    "name": "Parkrun",
+                                    "start_date": "2024-03-02T08:00:00Z",
+                                }
+                            ],
+                            "most_elevation_week": [
+                                {"rank": 1, "value": 2450.0, "week_start": "2024-07-08"}
+                            ],
+                        }
+                    }
+                }
+            ]
+        }
+    }
+
+
+class TypeTotals(BaseModel):
+    """Totals of one activity type."""
+
+    count: int
+    distance: float = Field(description="Meters")
+    moving_time: int = Field(description="Seconds")
+    elapsed_time: int = Field(description="Seconds")
+    elevation_gain: float = Field(description="Meters")
+    max_speed: float = Field(description="Fastest max speed in m/s")
+
+
+class ActivityTotals(BaseModel):
+    """Totals per activity type over a date range."""
+
+    after: Optional[str] = None
+    before: Optional[str] = None
+    types: Dict[str, TypeTotals]
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "after": "2024-01-01",
+                    "before": "2025-01-01",
+                    "types": {
+                        "Run": {
+                            "count": 142,
+                            "distance": 1250500.0,
+                            "moving_time": 450000,
+                            "elapsed_time": 470000,
+                            "elevation_gain": 15000.0,
+                            "max_speed": 6.8,
+                        }
+                    },
+                }
+            ]
+        }
+    }
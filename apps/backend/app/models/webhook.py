@@ -0,0 +1,16 @@
+"""Strava webhook models."""
+
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class StravaWebhookEvent(BaseModel):
+    """Push subscription event sent by Strava."""
+
+    object_type: str = Field(description="'activity' or 'athlete'")
+    object_id: int
+    aspect_type: str = Field(description="'create', 'update' or 'delete'")
+    owner_id: int
+    subscription_id: int
+    event_time: int
+    updates: Optional[Dict[str, Any]] = None
@@ -0,0 +1,55 @@
+"""Heart rate and power zone models."""
+
+from typing import Optional, List
+from pydantic import BaseModel, Field
+
+
+class Zone(BaseModel):
+    """Zone boundaries (bpm or watts); max of -1 means open-ended."""
+
+    min: int
+    max: int
+
+
+class ZoneSet(BaseModel):
+    """Zones of a single kind."""
+
+    custom_zones: Optional[bool] = None
+    zones: List[Zone]
+
+
+class AthleteZones(BaseModel):
+    """Athlete heart rate and power zones."""
+
+    heart_rate: Optional[ZoneSet] = None
+    power: Optional[ZoneSet] = None
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "heart_rate": {
+                        "custom_zones": False,
+                        "zones": [
+                            {"min": 0, "max": 123},
+                            {"min": 123, "max": 153},
+                            {"min": 153, "max": 169},
+                            {"min": 169, "max": 184},
+                            {"min": 184, "max": -1},
+                        ],
+                    },
+                    "power": None,
+                }
+            ]
+        }
+    }
+
+
+class ZoneDistribution(BaseModel):
+    """Aggregated time in zone over a date range."""
+
+    after: Optional[str] = Field(None, description="Inclusive ISO 8601 start of the range")
+    before: Optional[str] = Field(None, description="Exclusive ISO 8601 end of the range")
+    activities: int = Field(description="Activities with zone data in the range")
+    heartrate: List[int] = Field(description="Seconds spent in each heart rate zone")
+    power: List[int] = Field(description="Seconds spent in each power zone")
@@ -0,0 +1,266 @@
+"""Compact per-athlete activity columns for list, filter and aggregate queries from RAM."""
+
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import compress
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.dates import to_epoch
+from app.services.activity_store import SCHEMA as ACTIVITIES_SCHEMA, ActivityStore, activity_store
+
+# Column name -> array typecode. Measurements are float32 (~7 significant
+# digits), plenty for metres and m/s; ids and epochs need 64 bits.
+COLUMNS = {
+    "id": "q",
+    "start": "q",
+    "type": "H",
+    "distance": "f",
+    "moving_time": "I",
+    "elapsed_time": "I",
+    "elevation_gain": "f",
+    "average_speed": "f",
+    "max_speed": "f",
+}
+
+# Summed by ``AthleteColumns.totals``
+SUM_COLUMNS = ("distance", "moving_time", "elapsed_time", "elevation_gain")
+
+# Fixed cost of one athlete entry (column objects, dict, LRU slot)
+_ENTRY_OVERHEAD = 1024
+
+
+class TypeTable:
+    """Interned activity type names, shared by every athlete; a type costs 2 bytes per row."""
+
+    __slots__ = ("names", "codes")
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def code(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return code
+
+
+def _row_values(types: TypeTable, activity: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Values of COLUMNS for one Strava activity payload."""
+    start = activity.get("start_date")
+    return (
+        activity["id"],
+        to_epoch(start) if start else 0,
+        types.code(activity.get("type") or "Unknown"),
+        float(activity.get("distance") or 0.0),
+        int(activity.get("moving_time") or 0),
+        int(activity.get("elapsed_time") or 0),
+        float(activity.get("total_elevation_gain") or 0.0),
+        float(activity.get("average_speed") or 0.0),
+        float(activity.get("max_speed") or 0.0),
+    )
+
+
+class AthleteColumns:
+    """
+    Activities of one athlete as parallel typed arrays sorted by start time.
+
+    Time ranges are two binary searches; type filters compare 2-byte codes.
+    """
+
+    __slots__ = ("type_table", "arrays")
+
+    def __init__(self, type_table: TypeTable):
+        self.type_table = type_table
+        self.arrays: Dict[str, array] = {name: array(code) for name, code in COLUMNS.items()}
+
+    def __len__(self) -> int:
+        return len(self.arrays["id"])
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the column buffers, over-allocation included."""
+        return sum(sys.getsizeof(column) for column in self.arrays.values()) + _ENTRY_OVERHEAD
+
+    def append(self, values: Tuple[Any, ...]) -> None:
+        """Add a row known to start at or after every stored row (bulk loads)."""
+        for column, value in zip(self.arrays.values(), values):
+            column.append(value)
+
+    def insert(self, values: Tuple[Any, ...]) -> None:
+        starts = self.arrays["start"]
+        # After equal start times, like a bulk load in start order
+        index = bisect_right(starts, values[1])
+        for column, value in zip(self.arrays.values(), values):
+            column.insert(index, value)
+
+    def remove(self, activity_id: int) -> bool:
+        try:
+            index = self.arrays["id"].index(activity_id)
+        except ValueError:
+            return False
+        for column in self.arrays.values():
+            del column[index]
+        return True
+
+    def span(self, after: Optional[int] = None, before: Optional[int] = None) -> Tuple[int, int]:
+        """Row range [lo, hi) with ``after <= start < before`` (Unix seconds)."""
+        starts = self.arrays["start"]
+        lo = bisect_left(starts, after) if after is not None else 0
+        hi = bisect_left(starts, before) if before is not None else len(starts)
+        return lo, max(lo, hi)
+
+    def select(
+        self,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        activity_type: Optional[str] = None,
+    ) -> List[int]:
+        """Row indexes matching the filters, oldest first."""
+        lo, hi = self.span(after, before)
+        if activity_type is None:
+            return list(range(lo, hi))
+        code = self.type_table.codes.get(activity_type)
+        if code is None:
+            return []
+        types = self.arrays["type"]
+        return [i for i in range(lo, hi) if types[i] == code]
+
+    def totals(
+        self,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        activity_type: Optional[str] = None,
+    ) -> Dict[str, Dict[str, float]]:
+        """Count, SUM_COLUMNS sums and max speed per activity type within a time range."""
+        lo, hi = self.span(after, before)
+        types = self.arrays["type"][lo:hi]
+        if activity_type is None:
+            codes = sorted(set(types))
+        else:
+            code = self.type_table.codes.get(activity_type)
+            codes = [code] if code is not None and code in types else []
+        if not codes:
+            return {}
+        slices = {name: self.arrays[name][lo:hi] for name in (*SUM_COLUMNS, "max_speed")}
+        result = {}
+        for code in codes:
+            mask = [t == code for t in types]
+            entry: Dict[str, float] = {"count": sum(mask)}
+            for name in SUM_COLUMNS:
+                entry[name] = sum(compress(slices[name], mask))
+            entry["max_speed"] = max(compress(slices["max_speed"], mask))
+            result[self.type_table.names[code]] = entry
+        return result
+
+
+class ActivityIndex:
+    """
+    Per-athlete ``AthleteColumns`` under one global memory budget.
+
+    An athlete is loaded from the activity store on first use and kept
+    current by the store listener; least recently used athletes are evicted
+    whenever the total exceeds ``max_bytes``.
+    """
+
+    def __init__(self, store: ActivityStore, max_bytes: int):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.type_table = TypeTable()
+        self._athletes: "OrderedDict[int, AthleteColumns]" = OrderedDict()
+        self._sizes: Dict[int, int] = {}
+        self._total_bytes = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def athlete(self, athlete_id: int) -> AthleteColumns:
+        # Under the store's lock, which listeners also run under, so a write
+        # from another thread cannot land between the load and the install
+        with self.store.db.transaction():
+            columns = self._athletes.get(athlete_id)
+            if columns is not None:
+                self._athletes.move_to_end(athlete_id)
+                return columns
+            columns = self._load(athlete_id)
+            self._athletes[athlete_id] = columns
+            self._resize(athlete_id)
+            return columns
+
+    def _load(self, athlete_id: int) -> AthleteColumns:
+        # json_extract reads only the summary fields, not whole activity blobs
+        self.store.db.ensure_schema("activities", ACTIVITIES_SCHEMA)
+        rows = self.store.db.fetchall(
+            "SELECT id, CAST(strftime('%s', start_date) AS INTEGER) AS start, type, "
+            "json_extract(data, '$.distance') AS distance, "
+            "json_extract(data, '$.moving_time') AS moving_time, "
+            "json_extract(data, '$.elapsed_time') AS elapsed_time, "
+            "json_extract(data, '$.total_elevation_gain') AS total_elevation_gain, "
+            "json_extract(data, '$.average_speed') AS average_speed, "
+            "json_extract(data, '$.max_speed') AS max_speed "
+            "FROM activities WHERE athlete_id = ? ORDER BY start_date",
+            (athlete_id,),
+        )
+        columns = AthleteColumns(self.type_table)
+        code = self.type_table.code
+        for r in rows:
+            columns.append((
+                r["id"],
+                r["start"] or 0,
+                code(r["type"] or "Unknown"),
+                float(r["distance"] or 0.0),
+                int(r["moving_time"] or 0),
+                int(r["elapsed_time"] or 0),
+                float(r["total_elevation_gain"] or 0.0),
+                float(r["average_speed"] or 0.0),
+                float(r["max_speed"] or 0.0),
+            ))
+        self.loads += 1
+        return columns
+
+    def _resize(self, athlete_id: int) -> None:
+        """Re-account an athlete's memory and evict others down to the budget."""
+        size = self._athletes[athlete_id].nbytes
+        self._total_bytes += size - self._sizes.get(athlete_id, 0)
+        self._sizes[athlete_id] = size
+        # Least recently used first; the athlete just read or changed stays
+        for evicted in [a for a in self._athletes if a != athlete_id]:
+            if self._total_bytes <= self.max_bytes:
+                break
+            del self._athletes[evicted]
+            self._total_bytes -= self._sizes.pop(evicted)
+            self.evictions += 1
+
+    def on_activity_change(
+        self,
+        athlete_id: int,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        """Activity store listener; only athletes already in memory are touched."""
+        columns = self._athletes.get(athlete_id)
+        if columns is None:
+            return
+        if previous is not None:
+            columns.remove(previous["id"])
+        if activity is not None:
+            columns.insert(_row_values(self.type_table, activity))
+        self._resize(athlete_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "athletes": len(self._athletes),
+            "activities": sum(len(c) for c in self._athletes.values()),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "types": len(self.type_table.names),
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+
+activity_index = ActivityIndex(activity_store, max_bytes=int(settings.ACTIVITY_INDEX_MEMORY_MB * 1024 * 1024))
+activity_store.add_listener(activity_index.on_activity_change)
@@ -0,0 +1,172 @@
+"""Local activity store with change listeners for incremental indexes."""
+
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.database import Database, db
+
+# listener(athlete_id, new_activity, previous_activity)
+# new is None on delete, previous is None on first ingest. An activity that
+# moves to another athlete is a delete for the old owner, then a first ingest.
+ActivityListener = Callable[[int, Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY,
+    athlete_id INTEGER NOT NULL,
+    start_date TEXT NOT NULL,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_activities_athlete_start
+    ON activities (athlete_id, start_date);
+"""
+
+# Detail fields that are indexed elsewhere and not worth keeping in the raw blob
+_STRIPPED_FIELDS = ("segment_efforts",)
+
+
+class ActivityStore:
+    """
+    Persists ingested activities and notifies listeners of every change.
+
+    Listeners run inside the write transaction so SQLite-backed indexes are
+    updated atomically with the activity row.
+    """
+
+    def __init__(self, database: Database):
+        self.db = database
+        self._listeners: List[ActivityListener] = []
+
+    def _ensure_schema(self) -> None:
+        self.db.ensure_schema("activities", SCHEMA)
+
+    def add_listener(self, listener: ActivityListener) -> None:
+        self._listeners.append(listener)
+
+    def get(self, activity_id: int, athlete_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Stored activity, optionally only if it belongs to ``athlete_id``."""
+        self._ensure_schema()
+        if athlete_id is None:
+            row = self.db.fetchone("SELECT data FROM activities WHERE id = ?", (activity_id,))
+        else:
+            row = self.db.fetchone(
+                "SELECT data FROM activities WHERE id = ? AND athlete_id = ?", (activity_id, athlete_id)
+            )
+        return json.loads(row["data"]) if row else None
+
+    def get_many(self, athlete_id: int, activity_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Stored activities of ``athlete_id`` among ``activity_ids``, by id."""
+        self._ensure_schema()
+        if not activity_ids:
+            return {}
+        rows = self.db.fetchall(
+            f"SELECT id, data FROM activities WHERE athlete_id = ? AND id IN ({','.join('?' * len(activity_ids))})",
+            (athlete_id, *activity_ids),
+        )
+        return {row["id"]: json.loads(row["data"]) for row in rows}
+
+    def owners(self, activity_ids: List[int]) -> Dict[int, int]:
+        """Athlete ID of every stored activity among ``activity_ids``, whoever owns it."""
+        self._ensure_schema()
+        owners: Dict[int, int] = {}
+        # Chunked to stay under SQLite's bound parameter limit
+        for start in range(0, len(activity_ids), 500):
+            chunk = activity_ids[start:start + 500]
+            rows = self.db.fetchall(
+                f"SELECT id, athlete_id FROM activities WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            owners.update((row["id"], row["athlete_id"]) for row in rows)
+        return owners
+
+    def latest_start_date(self, athlete_id: int) -> Optional[str]:
+        """Start date of the most recent stored activity for an athlete."""
+        self._ensure_schema()
+        row = self.db.fetchone(
+            "SELECT MAX(start_date) AS start_date FROM activities WHERE athlete_id = ?",
+            (athlete_id,),
+        )
+        return row["start_date"] if row else None
+
+    def list(
+        self,
+        athlete_id: int,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Stored activities for an athlete, oldest first."""
+        self._ensure_schema()
+        sql = "SELECT data FROM activities WHERE athlete_id = ?"
+        params: List[Any] = [athlete_id]
+        if after:
+            sql += " AND start_date >= ?"
+            params.append(after)
+        if before:
+            sql += " AND start_date < ?"
+            params.append(before)
+        sql += " ORDER BY start_date"
+        return [json.loads(row["data"]) for row in self.db.fetchall(sql, params)]
+
+    def upsert(self, athlete_id: int, activity: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Insert or replace an activity and notify listeners.
+
+        Returns:
+            The previously stored version, if any
+        """
+        self._ensure_schema()
+        stored = {k: v for k, v in activity.items() if k not in _STRIPPED_FIELDS}
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT athlete_id, data FROM activities WHERE id = ?", (activity["id"],)
+            ).fetchone()
+            previous = json.loads(row["data"]) if row else None
+            conn.execute(
+                "INSERT OR REPLACE INTO activities (id, athlete_id, start_date, type, data, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    activity["id"],
+                    athlete_id,
+                    activity.get("start_date", ""),
+                    activity.get("type", "Unknown"),
+                    json.dumps(stored),
+                    int(time.time()),
+                ),
+            )
+            if row is not None and row["athlete_id"] != athlete_id:
+                changes = [(row["athlete_id"], None, previous), (athlete_id, activity, None)]
+            else:
+                changes = [(athlete_id, activity, previous)]
+            for owner, new, old in changes:
+                for listener in self._listeners:
+                    listener(owner, new, old)
+        return previous
+
+    def update_fields(self, activity_id: int, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply a partial update (e.g. from a webhook). Returns the previous version."""
+        self._ensure_schema()
+        row = self.db.fetchone("SELECT athlete_id, data FROM activities WHERE id = ?", (activity_id,))
+        if row is None:
+            return None
+        return self.upsert(row["athlete_id"], {**json.loads(row["data"]), **changes})
+
+    def delete(self, activity_id: int) -> Optional[Dict[str, Any]]:
+        """Remove an activity and notify listeners. Returns the removed version."""
+        self._ensure_schema()
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT athlete_id, data FROM activities WHERE id = ?", (activity_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            previous = json.loads(row["data"])
+            conn.execute("DELETE FROM activities WHERE id = ?", (activity_id,))
+            for listener in self._listeners:
+                listener(row["athlete_id"], None, previous)
+        return previous
+
+
+activity_store = ActivityStore(db)
@@ -0,0 +1,141 @@
+"""Athlete identity and profile caches."""
+
+import asyncio
+import hashlib
+from typing import Any, Dict, Iterable, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.models.zones import AthleteZones
+from app.services.cache import TTLCache
+from app.services.strava_client import StravaApiClient
+
+# Keyed by a hash of the access token so raw tokens are never held as keys
+_athlete_id_cache = TTLCache(ttl_seconds=settings.ATHLETE_CACHE_TTL_SECONDS, max_entries=10_000)
+
+# Zones almost never change; entries are dropped on athlete update webhooks
+_zones_cache = TTLCache(ttl_seconds=settings.ZONES_CACHE_TTL_SECONDS, max_entries=10_000)
+
+
+# Gear metadata: the athlete profile's gear list per athlete, plus single gear
+# fetched from /gear/{id} for items the profile no longer lists
+_athlete_gear_cache = TTLCache(ttl_seconds=settings.GEAR_CACHE_TTL_SECONDS, max_entries=10_000)
+_gear_cache = TTLCache(ttl_seconds=settings.GEAR_CACHE_TTL_SECONDS, max_entries=50_000)
+
+
+def _token_key(access_token: str) -> str:
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+
+async def resolve_athlete_id(client: StravaApiClient) -> int:
+    """
+    Return the athlete ID behind the client's access token.
+
+    Only the first call per token reaches Strava; later calls hit the cache.
+    """
+
+    async def load() -> int:
+        athlete = await client.get_athlete()
+        athlete_id = athlete.get("id")
+        if not athlete_id:
+            raise ValueError("Could not determine athlete ID")
+        return athlete_id
+
+    return await _athlete_id_cache.get_or_load(_token_key(client.access_token), load)
+
+
+def cached_athlete_id(client: StravaApiClient) -> Optional[int]:
+    """Athlete ID behind the client's token if already known, without a request."""
+    return _athlete_id_cache.get(_token_key(client.access_token))
+
+
+async def get_athlete_profile(client: StravaApiClient) -> Dict[str, Any]:
+    """
+    Fetch the authenticated athlete's profile.
+
+    The ID it carries is cached for ``resolve_athlete_id``, which then needs
+    no request of its own.
+    """
+    athlete = await client.get_athlete()
+    if athlete.get("id"):
+        _athlete_id_cache.set(_token_key(client.access_token), athlete["id"])
+    return athlete
+
+
+def _zones_from_strava(data: Dict[str, Any]) -> AthleteZones:
+    return AthleteZones(
+        heart_rate=data.get("heart_rate") or None,
+        power=data.get("power") or None,
+    )
+
+
+async def get_athlete_zones(
+    client: StravaApiClient,
+    athlete_id: int,
+    refresh: bool = False,
+) -> AthleteZones:
+    """
+    Return the athlete's heart rate and power zones.
+
+    Args:
+        client: Strava client for the athlete
+        athlete_id: Cache key
+        refresh: Drop the cached entry and fetch from Strava
+
+    Returns:
+        AthleteZones, from cache when available
+    """
+    if refresh:
+        _zones_cache.invalidate(athlete_id)
+
+    async def load() -> AthleteZones:
+        return _zones_from_strava(await client.get_athlete_zones())
+
+    return await _zones_cache.get_or_load(athlete_id, load)
+
+
+async def get_gear_metadata(
+    client: StravaApiClient,
+    athlete_id: int,
+    gear_ids: Iterable[str],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Return Strava metadata (name, brand, retired flag...) for each gear ID.
+
+    One cached profile request covers all gear the athlete lists; only gear
+    missing from the profile is fetched individually, and that is cached too.
+    """
+
+    async def load_profile_gear() -> Dict[str, Dict[str, Any]]:
+        athlete = await client.get_athlete()
+        return {g["id"]: g for g in (athlete.get("shoes") or []) + (athlete.get("bikes") or [])}
+
+    known = await _athlete_gear_cache.get_or_load(athlete_id, load_profile_gear)
+    missing = [gear_id for gear_id in gear_ids if gear_id not in known]
+
+    async def fetch_gear(gear_id: str) -> Dict[str, Any]:
+        try:
+            return await client.get_gear(gear_id)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            # Deleted gear: remember that so the next screen does not retry it
+            return {"id": gear_id}
+
+    async def load_gear(gear_id: str) -> Dict[str, Any]:
+        try:
+            return await _gear_cache.get_or_load(gear_id, lambda: fetch_gear(gear_id))
+        except Exception:
+            # Rate limit, timeout or server error: show the bare ID this time
+            # without caching it, so the next request retries
+            return {"id": gear_id}
+
+    fetched = await asyncio.gather(*(load_gear(gear_id) for gear_id in missing))
+    return {**known, **{g["id"]: g for g in fetched}}
+
+
+def invalidate_athlete(athlete_id: int) -> None:
+    """Forget cached per-athlete data after a profile update."""
+    _zones_cache.invalidate(athlete_id)
+    _athlete_gear_cache.invalidate(athlete_id)
@@ -0,0 +1,214 @@
+"""
+Process pool for CPU-bound work, so number crunching never blocks the event loop.
+
+Jobs are module-level functions (they must be picklable). Large typed arrays
+are handed to workers through shared memory rather than pickled: the job
+function receives them as keyword arguments holding read-only memoryviews,
+which it must not keep or return. Identical in-flight jobs (same ``key``)
+share one execution, and every job has an execution time limit enforced in
+the worker itself so a runaway job frees its process.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+
+class ComputeTimeout(TimeoutError):
+    """A compute job exceeded its time limit."""
+
+
+class SharedArray(NamedTuple):
+    """Picklable handle of an array copied into a shared memory block."""
+
+    name: str
+    typecode: str
+    length: int
+
+
+def _attach(handle: SharedArray) -> Tuple[SharedMemory, memoryview]:
+    # The parent alone owns and unlinks the block
+    try:
+        shm = SharedMemory(name=handle.name, track=False)  # Python 3.13+
+    except TypeError:
+        # Before 3.13 attaching registers the name, but forkserver workers
+        # share the parent's resource tracker, where that is a no-op
+        shm = SharedMemory(name=handle.name)
+    itemsize = array(handle.typecode).itemsize
+    return shm, shm.buf[: handle.length * itemsize].cast(handle.typecode)
+
+
+def _release(blocks: List[SharedMemory]) -> None:
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+
+def _on_alarm(signum: int, frame: Any) -> None:
+    raise ComputeTimeout("compute job exceeded its time limit")
+
+
+def _execute(
+    fn: Callable[..., Any],
+    args: Tuple[Any, ...],
+    shared: Dict[str, SharedArray],
+    timeout: Optional[float],
+) -> Any:
+    """Worker-side wrapper: map shared arrays, arm the time limit, run ``fn``."""
+    attached = {name: _attach(handle) for name, handle in shared.items()}
+    if timeout:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args, **{name: view for name, (_, view) in attached.items()})
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        for shm, view in attached.values():
+            view.release()
+            shm.close()
+
+
+class ComputeExecutor:
+    """
+    Runs CPU-bound jobs in a lazily started ``ProcessPoolExecutor``.
+
+    ``stats()`` reports queue depth (jobs waiting for a free worker), running
+    jobs and outcome counters for the health endpoint.
+    """
+
+    def __init__(self, max_workers: int, default_timeout: float, queue_timeout: float):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.default_timeout = default_timeout
+        self.queue_timeout = queue_timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._active = 0
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.total_seconds = 0.0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Forking a threaded server could copy a lock some other thread holds
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return self._pool
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+        arrays: Optional[Dict[str, array]] = None,
+    ) -> Any:
+        """
+        Run ``fn(*args, **arrays)`` in a worker process.
+
+        Args:
+            fn: Module-level function
+            key: Identifies the job; concurrent calls with the same key share
+                one execution and its result
+            timeout: Execution time limit in seconds (default from settings)
+            arrays: Typed arrays passed through shared memory, as keyword
+                arguments holding memoryviews
+
+        Raises:
+            ComputeTimeout: The job ran too long or waited too long for a worker
+        """
+        if key is not None:
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self.deduplicated += 1
+                # Shielded so one caller going away does not cancel the others
+                return await asyncio.shield(inflight)
+
+        job = asyncio.ensure_future(self._submit(fn, args, timeout or self.default_timeout, arrays or {}))
+        if key is not None:
+            self._inflight[key] = job
+            job.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(job) if key is not None else await job
+
+    async def _submit(
+        self,
+        fn: Callable[..., Any],
+        args: Tuple[Any, ...],
+        timeout: float,
+        arrays: Dict[str, array],
+    ) -> Any:
+        blocks: List[SharedMemory] = []
+        shared: Dict[str, SharedArray] = {}
+        future: Optional[Future] = None
+        try:
+            for name, values in arrays.items():
+                shm = SharedMemory(create=True, size=max(len(values) * values.itemsize, 1))
+                blocks.append(shm)
+                shm.buf[: len(values) * values.itemsize] = values.tobytes()
+                shared[name] = SharedArray(shm.name, values.typecode, len(values))
+
+            self.submitted += 1
+            self._active += 1
+            start = time.monotonic()
+            future = self.pool.submit(_execute, fn, args, shared, timeout)
+            try:
+                # The worker enforces the execution limit; this bounds queueing too
+                result = await asyncio.wait_for(asyncio.wrap_future(future), timeout + self.queue_timeout)
+            except (ComputeTimeout, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise ComputeTimeout(f"{getattr(fn, '__name__', 'job')} exceeded {timeout:g}s")
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self._active -= 1
+            self.completed += 1
+            self.total_seconds += time.monotonic() - start
+            return result
+        finally:
+            if future is None or future.cancel() or future.done():
+                _release(blocks)
+            else:
+                # Already handed to a worker, which may not have mapped the
+                # blocks yet: unlink them once the job ends
+                future.add_done_callback(lambda _: _release(blocks))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "started": self._pool is not None,
+            "queue_depth": max(self._active - self.max_workers, 0),
+            "running": min(self._active, self.max_workers),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "avg_seconds": round(self.total_seconds / self.completed, 3) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+compute_executor = ComputeExecutor(
+    max_workers=settings.COMPUTE_WORKERS,
+    default_timeout=settings.COMPUTE_JOB_TIMEOUT_SECONDS,
+    queue_timeout=settings.COMPUTE_QUEUE_TIMEOUT_SECONDS,
+)
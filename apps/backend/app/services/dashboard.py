@@ -0,0 +1,81 @@
+"""Building blocks of the composed dashboard response."""
+
+import asyncio
+from datetime import date, timedelta
+from typing import Any, Awaitable, Dict, List, Optional
+
+from app.core.dates import to_epoch
+from app.models.auth import StravaAthlete
+from app.models.stats import DashboardStats, TypeTotals
+from app.services.activity_index import activity_index
+
+
+def athlete_from_strava(athlete: Dict[str, Any]) -> StravaAthlete:
+    return StravaAthlete(
+        id=athlete.get("id", 0),
+        firstname=athlete.get("firstname", ""),
+        lastname=athlete.get("lastname", ""),
+        profile=athlete.get("profile"),
+        profile_medium=athlete.get("profile_medium"),
+        city=athlete.get("city"),
+        state=athlete.get("state"),
+        country=athlete.get("country"),
+    )
+
+
+def dashboard_stats_from_strava(stats: Dict[str, Any]) -> DashboardStats:
+    """Overview figures from a Strava ``/athletes/{id}/stats`` payload."""
+    run_ytd = stats.get("ytd_run_totals", {})
+    ride_ytd = stats.get("ytd_ride_totals", {})
+    run_recent = stats.get("recent_run_totals", {})
+    ride_recent = stats.get("recent_ride_totals", {})
+
+    return DashboardStats(
+        total_activities=run_ytd.get("count", 0) + ride_ytd.get("count", 0),
+        total_distance=(run_ytd.get("distance", 0) + ride_ytd.get("distance", 0)) / 1000,
+        total_time=run_ytd.get("moving_time", 0) + ride_ytd.get("moving_time", 0),
+        total_elevation=run_ytd.get("elevation_gain", 0) + ride_ytd.get("elevation_gain", 0),
+        this_week_activities=run_recent.get("count", 0) + ride_recent.get("count", 0),
+        this_week_distance=(run_recent.get("distance", 0) + ride_recent.get("distance", 0)) / 1000,
+        this_month_activities=0,
+        this_month_distance=0,
+    )
+
+
+def type_totals(totals: Dict[str, Dict[str, float]]) -> Dict[str, TypeTotals]:
+    """``AthleteColumns.totals`` rounded for the wire."""
+    return {
+        t: TypeTotals(
+            count=v["count"],
+            distance=round(v["distance"], 1),
+            moving_time=int(v["moving_time"]),
+            elapsed_time=int(v["elapsed_time"]),
+            elevation_gain=round(v["elevation_gain"], 1),
+            max_speed=round(v["max_speed"], 2),
+        )
+        for t, v in totals.items()
+    }
+
+
+def period_totals(athlete_id: int, today: date) -> Dict[str, Dict[str, TypeTotals]]:
+    """Totals per type of synced activities for the current week (from Monday) and month."""
+    columns = activity_index.athlete(athlete_id)
+    starts = {"week": today - timedelta(days=today.weekday()), "month": today.replace(day=1)}
+    return {
+        period: type_totals(columns.totals(after=to_epoch(start.isoformat())))
+        for period, start in starts.items()
+    }
+
+
+async def optional_part(name: str, part: Awaitable[Any], timeout: float, missing: List[str]) -> Optional[Any]:
+    """
+    Await one optional part of a composed response.
+
+    A part that times out or fails is recorded in ``missing`` and yields
+    None, so the rest of the response is still returned.
+    """
+    try:
+        return await asyncio.wait_for(part, timeout)
+    except Exception:
+        missing.append(name)
+        return None
@@ -0,0 +1,119 @@
+"""Per-athlete event bus for pushing live updates to connected clients."""
+
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.database import Database, db
+from app.services.activity_store import activity_store
+from app.services.rollups import activity_day, daily_rollups
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class Subscription:
+    """One connected client; events are queued until the client reads them."""
+
+    def __init__(self, athlete_id: int, max_queue: int):
+        self.athlete_id = athlete_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=max_queue)
+
+    def _put(self, event: Event) -> None:
+        # A slow client loses its oldest events rather than blocking publishers
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def deliver(self, event: Event) -> None:
+        """Thread-safe enqueue onto the subscriber's event loop."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._put(event)
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._put, event)
+
+
+class EventBus:
+    """Fan-out of named events to every subscription of an athlete."""
+
+    def __init__(self, database: Database, max_queue: int):
+        self.db = database
+        self.max_queue = max_queue
+        self._subscriptions: Dict[int, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, athlete_id: int) -> Subscription:
+        subscription = Subscription(athlete_id, self.max_queue)
+        self._subscriptions[athlete_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.athlete_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.athlete_id]
+
+    def has_subscribers(self, athlete_id: int) -> bool:
+        return athlete_id in self._subscriptions
+
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in self._subscriptions.values())
+
+    def publish(self, athlete_id: int, event: str, data: Dict[str, Any]) -> None:
+        for subscription in list(self._subscriptions.get(athlete_id, ())):
+            subscription.deliver((event, data))
+
+    def publish_on_commit(self, athlete_id: int, event: str, data: Dict[str, Any]) -> None:
+        """Publish once the open database transaction commits; dropped on rollback."""
+        self.db.on_commit(lambda: self.publish(athlete_id, event, data))
+
+    def on_activity_change(
+        self,
+        athlete_id: int,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        """
+        Activity store listener publishing ``activity`` and ``rollup`` events.
+
+        Registered after the rollup index listener (see imports), so rollup
+        values already include the change. Events go out after the store's
+        transaction commits.
+        """
+        if not self.has_subscribers(athlete_id):
+            return
+        current = activity or previous
+        action = "deleted" if activity is None else "updated" if previous else "created"
+        self.publish_on_commit(athlete_id, "activity", {
+            "action": action,
+            "activity": {
+                "id": current["id"],
+                "name": current.get("name", "Untitled"),
+                "type": current.get("type", "Unknown"),
+                "start_date": current.get("start_date", ""),
+                "distance": current.get("distance", 0.0),
+                "moving_time": current.get("moving_time", 0),
+            },
+        })
+
+        days = {activity_day(a) for a in (activity, previous) if a is not None}
+        for day in sorted(days):
+            totals = daily_rollups.day_totals(athlete_id, day)
+            if totals is not None:
+                self.publish_on_commit(athlete_id, "rollup", {"date": day.isoformat(), "types": totals})
+
+
+event_bus = EventBus(db, max_queue=settings.EVENTS_MAX_QUEUE)
+activity_store.add_listener(event_bus.on_activity_change)
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Serialize one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
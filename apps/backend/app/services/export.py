@@ -0,0 +1,145 @@
+"""Incremental GPX and TCX rendering of cached activity streams."""
+
+import asyncio
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from xml.sax.saxutils import escape, quoteattr
+
+from app.core.config import settings
+from app.core.dates import parse_strava_datetime
+from app.services.stream_cache import StreamColumn, stream_cache, streams_by_type
+from app.services.strava_client import StravaApiClient
+
+EXPORT_STREAMS = ("time", "latlng", "altitude", "distance", "heartrate", "cadence")
+
+# Strava activity type -> TCX Sport attribute
+_TCX_SPORTS = {"Run": "Running", "TrailRun": "Running", "VirtualRun": "Running", "Ride": "Biking", "VirtualRide": "Biking"}
+
+
+async def load_cached_streams(
+    client: StravaApiClient,
+    athlete_id: int,
+    activity_id: int,
+    types: Sequence[str] = EXPORT_STREAMS,
+) -> Dict[str, StreamColumn]:
+    """Cached streams among ``types``, fetching only types not cached yet."""
+    columns = stream_cache.columns(athlete_id, activity_id, types)
+    missing = [t for t in types if t not in columns]
+    if missing:
+        payload = await client.get_activity_streams(activity_id, missing)
+        # Packing and writing a long activity takes a while: off the event loop
+        await asyncio.to_thread(stream_cache.save, athlete_id, activity_id, missing, streams_by_type(payload))
+        columns = stream_cache.columns(athlete_id, activity_id, types)
+    return {t: c for t, c in columns.items() if c.length}
+
+
+def _timestamp(start: float, offset: Optional[int]) -> str:
+    return datetime.fromtimestamp(start + (offset or 0), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _value(values: Any, index: int) -> Optional[float]:
+    """Row ``index`` of a chunk, or None if the stream is missing, short or NaN."""
+    if values is None or index >= len(values):
+        return None
+    value = values[index]
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def _rows(columns: Dict[str, StreamColumn], chunk_rows: int) -> Iterator[List[Dict[str, Any]]]:
+    """Chunks of per-point dicts, reading ``chunk_rows`` rows of each column at a time."""
+    for chunk in stream_cache.iter_chunks(columns, chunk_rows):
+        latlng = chunk.get("latlng")
+        size = max((len(v) // columns[t].width for t, v in chunk.items()), default=0)
+        rows = []
+        for i in range(size):
+            row = {t: _value(chunk.get(t), i) for t in ("time", "altitude", "distance", "heartrate", "cadence")}
+            has_position = latlng is not None and 2 * i + 1 < len(latlng)
+            row["lat"] = latlng[2 * i] if has_position else None
+            row["lng"] = latlng[2 * i + 1] if has_position else None
+            rows.append(row)
+        yield rows
+
+
+def gpx_document(
+    activity: Dict[str, Any],
+    columns: Dict[str, StreamColumn],
+    chunk_rows: int = settings.EXPORT_CHUNK_POINTS,
+) -> Iterator[bytes]:
+    """GPX 1.1 track with Garmin heart rate/cadence extensions, one chunk at a time."""
+    start = parse_strava_datetime(activity["start_date"]).timestamp()
+    name = escape(activity.get("name", "Untitled"))
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<gpx version="1.1" creator="StraRun" xmlns="http://www.topografix.com/GPX/1/1" '
+        'xmlns:gpxtpx="http://www.garmin.com/xmlschemas/TrackPointExtension/v1">\n'
+        f"<metadata><name>{name}</name><time>{_timestamp(start, 0)}</time></metadata>\n"
+        f"<trk><name>{name}</name><type>{escape(activity.get('type', ''))}</type><trkseg>\n"
+    ).encode()
+
+    for rows in _rows(columns, chunk_rows):
+        parts = []
+        for row in rows:
+            if row["lat"] is None:
+                continue  # GPX track points need a position
+            parts.append(f'<trkpt lat="{row["lat"]:.6f}" lon="{row["lng"]:.6f}">')
+            if row["altitude"] is not None:
+                parts.append(f"<ele>{row['altitude']:.1f}</ele>")
+            parts.append(f"<time>{_timestamp(start, row['time'])}</time>")
+            if row["heartrate"] is not None or row["cadence"] is not None:
+                parts.append("<extensions><gpxtpx:TrackPointExtension>")
+                if row["heartrate"] is not None:
+                    parts.append(f"<gpxtpx:hr>{row['heartrate']}</gpxtpx:hr>")
+                if row["cadence"] is not None:
+                    parts.append(f"<gpxtpx:cad>{row['cadence']}</gpxtpx:cad>")
+                parts.append("</gpxtpx:TrackPointExtension></extensions>")
+            parts.append("</trkpt>\n")
+        yield "".join(parts).encode()
+
+    yield b"</trkseg></trk>\n</gpx>\n"
+
+
+def tcx_document(
+    activity: Dict[str, Any],
+    columns: Dict[str, StreamColumn],
+    chunk_rows: int = settings.EXPORT_CHUNK_POINTS,
+) -> Iterator[bytes]:
+    """TCX activity with a single lap, one chunk at a time."""
+    start = parse_strava_datetime(activity["start_date"]).timestamp()
+    started = _timestamp(start, 0)
+    sport = _TCX_SPORTS.get(activity.get("type", ""), "Other")
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">\n'
+        f"<Activities><Activity Sport={quoteattr(sport)}><Id>{started}</Id>\n"
+        f'<Lap StartTime="{started}">'
+        f"<TotalTimeSeconds>{activity.get('elapsed_time', 0)}</TotalTimeSeconds>"
+        f"<DistanceMeters>{float(activity.get('distance') or 0.0):.1f}</DistanceMeters>"
+        f"<Calories>{int(activity.get('calories') or 0)}</Calories>"
+        "<Intensity>Active</Intensity><TriggerMethod>Manual</TriggerMethod><Track>\n"
+    ).encode()
+
+    for rows in _rows(columns, chunk_rows):
+        parts = []
+        for row in rows:
+            parts.append(f"<Trackpoint><Time>{_timestamp(start, row['time'])}</Time>")
+            if row["lat"] is not None:
+                parts.append(
+                    f"<Position><LatitudeDegrees>{row['lat']:.6f}</LatitudeDegrees>"
+                    f"<LongitudeDegrees>{row['lng']:.6f}</LongitudeDegrees></Position>"
+                )
+            if row["altitude"] is not None:
+                parts.append(f"<AltitudeMeters>{row['altitude']:.1f}</AltitudeMeters>")
+            if row["distance"] is not None:
+                parts.append(f"<DistanceMeters>{row['distance']:.1f}</DistanceMeters>")
+            if row["heartrate"] is not None:
+                parts.append(f"<HeartRateBpm><Value>{row['heartrate']}</Value></HeartRateBpm>")
+            if row["cadence"] is not None:
+                parts.append(f"<Cadence>{row['cadence']}</Cadence>")
+            parts.append("</Trackpoint>\n")
+        yield "".join(parts).encode()
+
+    yield (
+        f"</Track></Lap><Notes>{escape(activity.get('name', 'Untitled'))}</Notes></Activity></Activities>\n"
+        "</TrainingCenterDatabase>\n"
+    ).encode()
@@ -0,0 +1,113 @@
+"""Per-gear mileage totals kept current on activity ingest."""
+
+from typing import Any, Dict, List, Optional
+
+from app.core.database import Database, db
+from app.services.activity_store import SCHEMA as ACTIVITIES_SCHEMA, activity_store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS gear_totals (
+    athlete_id INTEGER NOT NULL,
+    gear_id TEXT NOT NULL,
+    distance REAL NOT NULL DEFAULT 0,
+    moving_time REAL NOT NULL DEFAULT 0,
+    elevation_gain REAL NOT NULL DEFAULT 0,
+    activity_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (athlete_id, gear_id)
+);
+"""
+
+_BACKFILL = (
+    "INSERT INTO gear_totals (athlete_id, gear_id, distance, moving_time, elevation_gain, activity_count) "
+    "SELECT athlete_id, json_extract(data, '$.gear_id'), "
+    "SUM(COALESCE(json_extract(data, '$.distance'), 0)), "
+    "SUM(COALESCE(json_extract(data, '$.moving_time'), 0)), "
+    "SUM(COALESCE(json_extract(data, '$.total_elevation_gain'), 0)), "
+    "COUNT(*) FROM activities WHERE json_extract(data, '$.gear_id') IS NOT NULL "
+    "GROUP BY athlete_id, json_extract(data, '$.gear_id')"
+)
+
+
+class GearMileageIndex:
+    """
+    Running distance, time and activity count per athlete and gear.
+
+    The store listener applies each ingest, edit or delete as a delta, so
+    reads are a primary-key lookup and never scan activities.
+    """
+
+    def __init__(self, database: Database):
+        self.db = database
+        self._ready = False
+
+    def _ensure_schema(self) -> bool:
+        """Create the table; returns True if it was just created and backfilled."""
+        if self._ready:
+            return False
+        self.db.ensure_schema("activities", ACTIVITIES_SCHEMA)
+        with self.db.transaction() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'gear_totals'"
+            ).fetchone()
+            if exists is None:
+                # execute() rather than executescript(), which would commit the
+                # store transaction this may run in
+                conn.execute(SCHEMA)
+                # Activities stored before the index existed
+                conn.execute(_BACKFILL)
+        self._ready = True
+        return exists is None
+
+    def _add(self, athlete_id: int, activity: Dict[str, Any], sign: int) -> None:
+        gear_id = activity.get("gear_id")
+        if not gear_id:
+            return
+        self.db.connection.execute(
+            "INSERT INTO gear_totals (athlete_id, gear_id, distance, moving_time, elevation_gain, activity_count) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (athlete_id, gear_id) DO UPDATE SET "
+            "distance = distance + excluded.distance, "
+            "moving_time = moving_time + excluded.moving_time, "
+            "elevation_gain = elevation_gain + excluded.elevation_gain, "
+            "activity_count = activity_count + excluded.activity_count",
+            (
+                athlete_id,
+                gear_id,
+                sign * float(activity.get("distance") or 0.0),
+                sign * float(activity.get("moving_time") or 0),
+                sign * float(activity.get("total_elevation_gain") or 0.0),
+                sign,
+            ),
+        )
+
+    def on_activity_change(
+        self,
+        athlete_id: int,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        """Activity store listener; runs inside the store's write transaction."""
+        if self._ensure_schema():
+            # The backfill already saw this change
+            return
+        if previous is not None:
+            self._add(athlete_id, previous, -1)
+        if activity is not None:
+            self._add(athlete_id, activity, 1)
+        self.db.connection.execute(
+            "DELETE FROM gear_totals WHERE athlete_id = ? AND activity_count <= 0", (athlete_id,)
+        )
+
+    def totals(self, athlete_id: int) -> List[Dict[str, Any]]:
+        """Totals per gear for an athlete, most distance first."""
+        self._ensure_schema()
+        rows = self.db.fetchall(
+            "SELECT gear_id, distance, moving_time, elevation_gain, activity_count "
+            "FROM gear_totals WHERE athlete_id = ? ORDER BY distance DESC",
+            (athlete_id,),
+        )
+        return [dict(row) for row in rows]
+
+
+gear_index = GearMileageIndex(db)
+activity_store.add_listener(gear_index.on_activity_change)
@@ -0,0 +1,383 @@
+"""
+Bulk import of a Strava account export archive.
+
+The archive (Settings > My Account > Download your data) holds
+``activities.csv`` plus the original GPX/TCX/FIT file of each activity under
+``activities/``, optionally gzipped. Summaries come from the CSV and streams
+from the files, which are parsed by the compute executor's process pool;
+nothing is requested from the Strava API.
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import math
+import zipfile
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, List, Optional, Tuple
+from xml.etree.ElementTree import iterparse
+
+from app.core.config import settings
+from app.core.dates import parse_strava_datetime
+from app.models.activity import ImportResult
+from app.services.activity_store import ActivityStore, activity_store
+from app.services.compute import ComputeExecutor, ComputeTimeout, compute_executor
+from app.services.events import EventBus, event_bus
+from app.services.export import EXPORT_STREAMS
+from app.services.route_index import EARTH_RADIUS_M, encode_polyline
+from app.services.stream_cache import ActivityStreamCache, pack_streams, stream_cache
+
+try:  # Optional: FIT file decoding
+    import fitdecode
+except ImportError:  # pragma: no cover - depends on installed extras
+    fitdecode = None
+
+CSV_NAME = "activities.csv"
+
+# Points kept in the generated summary polyline
+SUMMARY_POLYLINE_POINTS = 500
+
+# Cap on file errors listed in the result
+MAX_REPORTED_ERRORS = 50
+
+# FIT positions are semicircles
+_SEMICIRCLE_DEGREES = 180 / 2 ** 31
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except ValueError:
+        return None
+
+
+def _parse_xml_points(stream: IO[bytes], point_tag: str) -> List[Dict[str, Any]]:
+    """Track points of a GPX (``trkpt``) or TCX (``Trackpoint``) file."""
+    points = []
+    for _, element in iterparse(stream, events=("end",)):
+        if _local_name(element.tag) != point_tag:
+            continue
+        values = {_local_name(child.tag): child.text for child in element.iter()}
+        lat = _number(element.get("lat") or values.get("LatitudeDegrees"))
+        lng = _number(element.get("lon") or values.get("LongitudeDegrees"))
+        time_text = values.get("time") or values.get("Time")
+        points.append({
+            "time": parse_strava_datetime(time_text).timestamp() if time_text else None,
+            "lat": lat,
+            "lng": lng,
+            "altitude": _number(values.get("ele") or values.get("AltitudeMeters")),
+            "distance": _number(values.get("DistanceMeters")),
+            # GPX Garmin extension (hr/cad) or TCX (HeartRateBpm/Value, Cadence)
+            "heartrate": _number(values.get("hr") or values.get("Value")),
+            "cadence": _number(values.get("cad") or values.get("Cadence")),
+        })
+        element.clear()
+    return points
+
+
+def _parse_fit_points(stream: IO[bytes]) -> List[Dict[str, Any]]:
+    """``record`` messages of a FIT file (requires the optional fitdecode package)."""
+    if fitdecode is None:
+        raise ValueError("FIT files need the optional fitdecode package")
+    points = []
+    with fitdecode.FitReader(stream) as fit:
+        for frame in fit:
+            if not isinstance(frame, fitdecode.FitDataMessage) or frame.name != "record":
+                continue
+            lat = frame.get_value("position_lat", fallback=None)
+            lng = frame.get_value("position_long", fallback=None)
+            timestamp = frame.get_value("timestamp", fallback=None)
+            points.append({
+                "time": timestamp.timestamp() if timestamp else None,
+                "lat": lat * _SEMICIRCLE_DEGREES if lat is not None else None,
+                "lng": lng * _SEMICIRCLE_DEGREES if lng is not None else None,
+                "altitude": frame.get_value("enhanced_altitude", fallback=None)
+                or frame.get_value("altitude", fallback=None),
+                "distance": frame.get_value("distance", fallback=None),
+                "heartrate": frame.get_value("heart_rate", fallback=None),
+                "cadence": frame.get_value("cadence", fallback=None),
+            })
+    return points
+
+
+def _haversine(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+def _streams_from_points(points: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Strava-style streams plus route fields derived from track points."""
+    points = [p for p in points if p["time"] is not None]
+    if not points:
+        return {"streams": {}}
+    start = points[0]["time"]
+    streams: Dict[str, List[Any]] = {"time": [int(p["time"] - start) for p in points]}
+    positions = [(p["lat"], p["lng"]) for p in points if p["lat"] is not None and p["lng"] is not None]
+    if len(positions) == len(points):
+        streams["latlng"] = [[round(lat, 6), round(lng, 6)] for lat, lng in positions]
+    for key in ("altitude", "heartrate", "cadence", "distance"):
+        if any(p[key] is not None for p in points):
+            streams[key] = [p[key] for p in points]
+    if "distance" not in streams and "latlng" in streams:
+        total = 0.0
+        distance = [0.0]
+        for a, b in zip(positions, positions[1:]):
+            total += _haversine(a, b)
+            distance.append(round(total, 1))
+        streams["distance"] = distance
+
+    result: Dict[str, Any] = {"streams": streams, "start_time": start}
+    if positions:
+        step = max(1, len(positions) // SUMMARY_POLYLINE_POINTS)
+        sampled = positions[::step]
+        if sampled[-1] != positions[-1]:
+            sampled.append(positions[-1])
+        result["start_latlng"] = list(positions[0])
+        result["end_latlng"] = list(positions[-1])
+        result["summary_polyline"] = encode_polyline(sampled)
+    return result
+
+
+def parse_track_file(archive_path: str, member: str) -> Dict[str, Any]:
+    """
+    Parse one activity file from the archive (runs in a worker process).
+
+    Returns:
+        Route fields and streams packed for the stream cache (``packed``,
+        with the ``stream_types`` found), or ``{"error": ...}`` if the file is
+        unusable
+    """
+    try:
+        with zipfile.ZipFile(archive_path) as archive, archive.open(member) as raw:
+            stream: IO[bytes] = gzip.GzipFile(fileobj=raw) if member.endswith(".gz") else raw
+            name = member[:-3] if member.endswith(".gz") else member
+            if name.endswith(".gpx"):
+                points = _parse_xml_points(stream, "trkpt")
+            elif name.endswith(".tcx"):
+                # Some devices write leading whitespace before the XML declaration
+                points = _parse_xml_points(io.BytesIO(stream.read().lstrip()), "Trackpoint")
+            elif name.endswith(".fit"):
+                points = _parse_fit_points(stream)
+            else:
+                return {"error": f"unsupported file type: {member}"}
+        result = _streams_from_points(points)
+        streams = result.pop("streams")
+        # Encoding here keeps it off the event loop and shrinks what is sent back
+        result["stream_types"] = sorted(streams)
+        result["packed"] = pack_streams(EXPORT_STREAMS, streams) if streams else []
+        return result
+    except Exception as e:
+        return {"error": f"{member}: {e}"}
+
+
+def _parse_csv_date(value: str) -> Optional[str]:
+    """``Jan 5, 2020, 7:30:12 AM`` (UTC) -> ISO 8601."""
+    try:
+        parsed = datetime.strptime(value.strip(), "%b %d, %Y, %I:%M:%S %p")
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def read_activity_rows(archive: zipfile.ZipFile) -> List[Dict[str, str]]:
+    """
+    Rows of ``activities.csv``.
+
+    The export repeats some headers (``Distance`` in km, then in metres); the
+    last occurrence is the precise one, so later columns win.
+    """
+    with archive.open(CSV_NAME) as raw:
+        reader = csv.reader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+        header = next(reader, [])
+        rows = []
+        for values in reader:
+            row: Dict[str, str] = {}
+            for name, value in zip(header, values):
+                if value != "" or name not in row:
+                    row[name] = value
+            rows.append(row)
+    return rows
+
+
+def activity_from_row(row: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """Strava-shaped summary of one CSV row, or None without an ID and date."""
+    activity_id = _number(row.get("Activity ID"))
+    start_date = _parse_csv_date(row.get("Activity Date", ""))
+    if activity_id is None or start_date is None:
+        return None
+    activity_type = (row.get("Activity Type") or "Workout").replace(" ", "")
+    distance = _number(row.get("Distance")) or 0.0
+    moving_time = int(_number(row.get("Moving Time")) or _number(row.get("Elapsed Time")) or 0)
+    average_heartrate = _number(row.get("Average Heart Rate"))
+    return {
+        "id": int(activity_id),
+        "name": row.get("Activity Name") or "Untitled",
+        "type": activity_type,
+        "sport_type": activity_type,
+        "start_date": start_date,
+        "start_date_local": start_date,
+        "timezone": "",
+        "distance": distance,
+        "moving_time": moving_time,
+        "elapsed_time": int(_number(row.get("Elapsed Time")) or moving_time),
+        "total_elevation_gain": _number(row.get("Elevation Gain")) or 0.0,
+        "average_speed": _number(row.get("Average Speed")) or (distance / moving_time if moving_time else 0.0),
+        "max_speed": _number(row.get("Max Speed")) or 0.0,
+        "average_heartrate": average_heartrate,
+        "max_heartrate": _number(row.get("Max Heart Rate")),
+        "has_heartrate": average_heartrate is not None,
+        "calories": _number(row.get("Calories")),
+        "description": row.get("Activity Description") or None,
+        "commute": (row.get("Commute") or "").lower() in ("true", "1"),
+        "manual": not row.get("Filename"),
+        "imported": True,
+    }
+
+
+class ArchiveImporter:
+    """Seeds the activity store and stream cache from an export archive."""
+
+    def __init__(
+        self,
+        store: ActivityStore,
+        streams: ActivityStreamCache,
+        events: EventBus,
+        compute: ComputeExecutor,
+        batch_size: int,
+        file_timeout: float,
+    ):
+        self.store = store
+        self.streams = streams
+        self.events = events
+        self.compute = compute
+        self.batch_size = batch_size
+        self.file_timeout = file_timeout
+
+    def _write_batch(self, athlete_id: int, batch: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+        """Store a batch of (activity, parsed file) pairs in one transaction."""
+        with self.store.db.transaction():
+            for activity, parsed in batch:
+                if parsed.get("summary_polyline"):
+                    activity["start_latlng"] = parsed["start_latlng"]
+                    activity["end_latlng"] = parsed["end_latlng"]
+                    activity["map"] = {"summary_polyline": parsed["summary_polyline"]}
+                if parsed.get("packed"):
+                    activity["has_heartrate"] = activity["has_heartrate"] or "heartrate" in parsed["stream_types"]
+                    self.streams.save_packed(athlete_id, activity["id"], parsed["packed"], prune=False)
+                self.store.upsert(athlete_id, activity)
+            self.streams.prune()
+
+    async def import_archive(self, athlete_id: int, archive_path: str, overwrite: bool = False) -> ImportResult:
+        """
+        Import every activity in the archive, writing in batches as files are parsed.
+
+        Args:
+            athlete_id: Owner of the imported activities
+            archive_path: Path of the uploaded zip file
+            overwrite: Replace activities that are already stored (e.g. synced
+                with richer API data); by default they are skipped
+
+        Returns:
+            ImportResult with counts of imported, skipped and failed items
+        """
+        with zipfile.ZipFile(archive_path) as archive:
+            if CSV_NAME not in archive.namelist():
+                raise ValueError(f"Not a Strava export archive: {CSV_NAME} is missing")
+            members = set(archive.namelist())
+            rows = read_activity_rows(archive)
+
+        activities = [(activity_from_row(row), row) for row in rows]
+        # Stored owner of every ID, across athletes: an archive must never
+        # replace another athlete's activity, even with overwrite
+        owners = self.store.owners([a["id"] for a, _ in activities if a is not None])
+        pending: List[Tuple[Dict[str, Any], Optional[str]]] = []
+        skipped = 0
+        errors: List[str] = []
+        for activity, row in activities:
+            if activity is None:
+                skipped += 1
+                continue
+            owner = owners.get(activity["id"])
+            if owner is not None and owner != athlete_id:
+                skipped += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(f"Activity {activity['id']} belongs to another athlete")
+                continue
+            if owner is not None and not overwrite:
+                skipped += 1
+                continue
+            filename = row.get("Filename") or None
+            pending.append((activity, filename if filename in members else None))
+
+        total = len(pending)
+        self.events.publish(athlete_id, "import", {"status": "started", "total": total})
+        imported = with_streams = 0
+        batch: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+
+        async def flush() -> None:
+            nonlocal imported
+            # Off the event loop: packing streams and the listeners take a while.
+            # Index builds take the store's lock, so they never interleave with it.
+            await asyncio.to_thread(self._write_batch, athlete_id, batch)
+            imported += len(batch)
+            batch.clear()
+            self.events.publish(athlete_id, "import", {"status": "progress", "imported": imported, "total": total})
+
+        # Keep at most one file per worker queued, so interactive compute jobs
+        # never wait behind a whole archive and queued files never time out
+        slots = asyncio.Semaphore(self.compute.max_workers)
+
+        async def parse(activity: Dict[str, Any], filename: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+            async with slots:
+                try:
+                    parsed = await self.compute.run(
+                        parse_track_file, archive_path, filename, timeout=self.file_timeout
+                    )
+                except ComputeTimeout as e:
+                    parsed = {"error": f"{filename}: {e}"}
+            return activity, parsed
+
+        try:
+            tasks = []
+            for activity, filename in pending:
+                if filename is None:
+                    batch.append((activity, {}))
+                    if len(batch) >= self.batch_size:
+                        await flush()
+                else:
+                    tasks.append(parse(activity, filename))
+            for next_parsed in asyncio.as_completed(tasks):
+                activity, parsed = await next_parsed
+                if "error" in parsed:
+                    # The CSV summary is still imported, just without streams
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append(parsed["error"])
+                elif parsed.get("packed"):
+                    with_streams += 1
+                batch.append((activity, parsed))
+                if len(batch) >= self.batch_size:
+                    await flush()
+            if batch:
+                await flush()
+        except Exception as e:
+            self.events.publish(athlete_id, "import", {"status": "failed", "error": str(e)})
+            raise
+        result = ImportResult(imported=imported, with_streams=with_streams, skipped=skipped, errors=errors)
+        self.events.publish(athlete_id, "import", {"status": "completed", **result.model_dump(exclude={"errors"})})
+        return result
+
+
+archive_importer = ArchiveImporter(
+    activity_store,
+    stream_cache,
+    event_bus,
+    compute_executor,
+    batch_size=settings.IMPORT_BATCH_SIZE,
+    file_timeout=settings.IMPORT_FILE_TIMEOUT_SECONDS,
+)
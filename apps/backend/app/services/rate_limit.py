@@ -0,0 +1,178 @@
+"""App-wide Strava quota accounting and request scheduling."""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from enum import IntEnum
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+class Priority(IntEnum):
+    """
+    Request classes, highest priority first.
+
+    Webhook events carry no athlete token, so they never trigger Strava
+    requests of their own; new activities arrive with the next sync.
+    """
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class RateLimiter:
+    """Sliding-window accounting of Strava's 15-minute and daily limits."""
+
+    WINDOW_15MIN = 15 * 60
+    WINDOW_DAY = 24 * 60 * 60
+
+    def __init__(self, requests_per_15min: int = 100, requests_per_day: int = 1000):
+        self.requests_per_15min = requests_per_15min
+        self.requests_per_day = requests_per_day
+        self.requests_15min: Deque[float] = deque()
+        self.requests_day: Deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        while self.requests_15min and self.requests_15min[0] <= now - self.WINDOW_15MIN:
+            self.requests_15min.popleft()
+        while self.requests_day and self.requests_day[0] <= now - self.WINDOW_DAY:
+            self.requests_day.popleft()
+
+    def available(self, now: float, reserve_15min: int = 0, reserve_day: int = 0) -> bool:
+        """Whether a request fits while leaving ``reserve_*`` slots unused."""
+        self._prune(now)
+        return (
+            len(self.requests_15min) < self.requests_per_15min - reserve_15min
+            and len(self.requests_day) < self.requests_per_day - reserve_day
+        )
+
+    def seconds_until_available(self, now: float, reserve_15min: int = 0, reserve_day: int = 0) -> float:
+        """Time until ``available`` becomes true for the same reserves."""
+        self._prune(now)
+        wait = 0.0
+        for window, limit, reserve, requests in (
+            (self.WINDOW_15MIN, self.requests_per_15min, reserve_15min, self.requests_15min),
+            (self.WINDOW_DAY, self.requests_per_day, reserve_day, self.requests_day),
+        ):
+            excess = len(requests) - (limit - reserve)
+            if excess >= 0:
+                # The request that must expire before one more slot opens;
+                # clamped for reserves that leave no slot at all
+                oldest = requests[min(excess, len(requests) - 1)] if requests else now
+                wait = max(wait, oldest + window - now)
+        return wait
+
+    def record(self, now: float) -> None:
+        self.requests_15min.append(now)
+        self.requests_day.append(now)
+
+    def usage(self, now: float) -> Tuple[int, int]:
+        self._prune(now)
+        return len(self.requests_15min), len(self.requests_day)
+
+
+class _ClassQueue:
+    """Waiters of one priority class, served round-robin across athletes."""
+
+    def __init__(self):
+        self.waiters: "OrderedDict[str, Deque[Tuple[asyncio.Future, float]]]" = OrderedDict()
+        self.depth = 0
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def push(self, key: str, future: asyncio.Future, now: float) -> None:
+        self.waiters.setdefault(key, deque()).append((future, now))
+        self.depth += 1
+
+    def pop(self) -> Tuple[asyncio.Future, float]:
+        key, pending = next(iter(self.waiters.items()))
+        item = pending.popleft()
+        if pending:
+            # Next turn goes to the next athlete in line
+            self.waiters.move_to_end(key)
+        else:
+            del self.waiters[key]
+        self.depth -= 1
+        return item
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.depth,
+            "waiting_athletes": len(self.waiters),
+            "granted": self.granted,
+            "avg_wait_seconds": round(self.total_wait / self.granted, 3) if self.granted else 0.0,
+            "max_wait_seconds": round(self.max_wait, 3),
+        }
+
+
+class QuotaScheduler:
+    """
+    Shares the application's Strava quota between all users.
+
+    Requests wait in one queue per priority class. Higher classes are always
+    served first, athletes within a class take turns, and part of the quota is
+    held back so background work can never starve interactive requests.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        interactive_reserve_15min: int = 0,
+        interactive_reserve_day: int = 0,
+    ):
+        self.limiter = limiter
+        # Background work always keeps at least one slot per window
+        self.interactive_reserve_15min = max(min(interactive_reserve_15min, limiter.requests_per_15min - 1), 0)
+        self.interactive_reserve_day = max(min(interactive_reserve_day, limiter.requests_per_day - 1), 0)
+        self._queues = {priority: _ClassQueue() for priority in Priority}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _reserves(self, priority: Priority) -> Tuple[int, int]:
+        if priority is Priority.INTERACTIVE:
+            return 0, 0
+        return self.interactive_reserve_15min, self.interactive_reserve_day
+
+    async def acquire(self, priority: Priority, key: str) -> None:
+        """Wait until a request of ``priority`` for athlete ``key`` may be sent."""
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].push(key, future, time.monotonic())
+        self._dispatch()
+        await future
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        for priority in Priority:
+            queue = self._queues[priority]
+            reserves = self._reserves(priority)
+            while queue.depth and self.limiter.available(now, *reserves):
+                future, enqueued_at = queue.pop()
+                if future.done():  # Caller went away while queued
+                    continue
+                self.limiter.record(now)
+                waited = now - enqueued_at
+                queue.granted += 1
+                queue.total_wait += waited
+                queue.max_wait = max(queue.max_wait, waited)
+                future.set_result(None)
+            if queue.depth:
+                # Lower classes have a smaller budget, so they are blocked too
+                delay = self.limiter.seconds_until_available(now, *reserves)
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        used_15min, used_day = self.limiter.usage(time.monotonic())
+        return {
+            "usage": {
+                "15min": {"used": used_15min, "limit": self.limiter.requests_per_15min},
+                "day": {"used": used_day, "limit": self.limiter.requests_per_day},
+            },
+            "interactive_reserve": {
+                "15min": self.interactive_reserve_15min,
+                "day": self.interactive_reserve_day,
+            },
+            "classes": {p.name.lower(): self._queues[p].stats() for p in Priority},
+        }
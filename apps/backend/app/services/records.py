@@ -0,0 +1,248 @@
+"""Incrementally maintained personal-records index."""
+
+import heapq
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.activity_store import ActivityStore, activity_store
+from app.services.events import EventBus, event_bus
+from app.services.rollups import activity_day
+
+
+def _best_effort(name: str) -> Callable[[Dict[str, Any]], Optional[float]]:
+    def extract(activity: Dict[str, Any]) -> Optional[float]:
+        times = [e.get("elapsed_time") for e in activity.get("best_efforts") or [] if e.get("name") == name]
+        return min((t for t in times if t), default=None)
+
+    return extract
+
+
+# metric -> (extractor, higher_is_better)
+ACTIVITY_METRICS: Dict[str, Tuple[Callable[[Dict[str, Any]], Optional[float]], bool]] = {
+    "longest_distance": (lambda a: a.get("distance") or None, True),
+    "longest_moving_time": (lambda a: a.get("moving_time") or None, True),
+    "biggest_climb": (lambda a: a.get("total_elevation_gain") or None, True),
+    "fastest_1k": (_best_effort("1k"), False),
+    "fastest_mile": (_best_effort("1 mile"), False),
+    "fastest_5k": (_best_effort("5k"), False),
+    "fastest_10k": (_best_effort("10k"), False),
+    "fastest_half_marathon": (_best_effort("Half-Marathon"), False),
+    "fastest_marathon": (_best_effort("Marathon"), False),
+}
+
+# metric -> activity field summed per ISO week
+WEEKLY_METRICS = {
+    "most_distance_week": "distance",
+    "most_elevation_week": "total_elevation_gain",
+}
+
+
+class TopK:
+    """
+    Best ``k`` values by key, kept as a min-heap of (score, key).
+
+    Members that get worse or disappear cannot be replaced from the heap
+    alone, so the structure then reports itself ``stale`` and the owner
+    rebuilds it from storage.
+    """
+
+    __slots__ = ("k", "heap", "scores", "meta", "stale")
+
+    def __init__(self, k: int):
+        self.k = k
+        self.heap: List[Tuple[float, Hashable]] = []
+        self.scores: Dict[Hashable, float] = {}
+        self.meta: Dict[Hashable, Dict[str, Any]] = {}
+        self.stale = False
+
+    def set(self, key: Hashable, score: Optional[float], meta: Optional[Dict[str, Any]] = None) -> None:
+        """Record the current score of ``key`` (None removes it)."""
+        current = self.scores.get(key)
+        if current is not None:
+            if score is not None and score >= current:
+                self._replace(key, score, meta)
+                return
+            self._remove(key)
+            # A non-member might now belong in the top k
+            if len(self.scores) == self.k - 1:
+                self.stale = True
+        if score is None:
+            return
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, (score, key))
+        elif score > self.heap[0][0]:
+            _, evicted = heapq.heapreplace(self.heap, (score, key))
+            del self.scores[evicted]
+            self.meta.pop(evicted, None)
+        else:
+            return
+        self.scores[key] = score
+        self.meta[key] = meta or {}
+
+    def _replace(self, key: Hashable, score: float, meta: Optional[Dict[str, Any]]) -> None:
+        self.heap = [(s, k) for s, k in self.heap if k != key]
+        self.heap.append((score, key))
+        heapq.heapify(self.heap)
+        self.scores[key] = score
+        if meta is not None:
+            self.meta[key] = meta
+
+    def _remove(self, key: Hashable) -> None:
+        self.heap = [(s, k) for s, k in self.heap if k != key]
+        heapq.heapify(self.heap)
+        del self.scores[key]
+        self.meta.pop(key, None)
+
+    def best_key(self) -> Optional[Hashable]:
+        return max(self.heap)[1] if self.heap else None
+
+    def ranked(self) -> List[Tuple[Hashable, float, Dict[str, Any]]]:
+        return [(key, score, self.meta[key]) for score, key in sorted(self.heap, reverse=True)]
+
+
+class AthleteRecords:
+    """Top-k structures of one athlete, keyed by (sport type, metric)."""
+
+    __slots__ = ("top", "weeks")
+
+    def __init__(self):
+        self.top: Dict[Tuple[str, str], TopK] = {}
+        # (type, week start) -> weekly field totals
+        self.weeks: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def topk(self, activity_type: str, metric: str, k: int) -> TopK:
+        top = self.top.get((activity_type, metric))
+        if top is None:
+            top = self.top[(activity_type, metric)] = TopK(k)
+        return top
+
+    @property
+    def stale(self) -> bool:
+        return any(t.stale for t in self.top.values())
+
+
+def _week_start(activity: Dict[str, Any]) -> str:
+    day = activity_day(activity)
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+class PersonalRecordsIndex:
+    """
+    Per-metric top-k heaps per sport type, per athlete.
+
+    Built from the activity store on first read and maintained by the store
+    listener, so reads are O(k) per metric. A new best entry is published as
+    a ``record`` event.
+    """
+
+    def __init__(self, store: ActivityStore, events: EventBus, k: int, max_athletes: int):
+        self.store = store
+        self.events = events
+        self.k = k
+        self.max_athletes = max_athletes
+        self._athletes: "OrderedDict[int, AthleteRecords]" = OrderedDict()
+
+    def records(self, athlete_id: int) -> AthleteRecords:
+        # Under the store's lock, like the listener, so no write is missed
+        with self.store.db.transaction():
+            athlete = self._athletes.get(athlete_id)
+            if athlete is None or athlete.stale:
+                athlete = AthleteRecords()
+                for activity in self.store.list(athlete_id):
+                    self._apply(athlete, activity, None)
+                self._athletes[athlete_id] = athlete
+                while len(self._athletes) > self.max_athletes:
+                    self._athletes.popitem(last=False)
+            else:
+                self._athletes.move_to_end(athlete_id)
+            return athlete
+
+    def _apply(
+        self,
+        athlete: AthleteRecords,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        current = activity or previous
+        activity_id = current["id"]
+        new_type = activity.get("type", "Unknown") if activity else None
+        old_type = previous.get("type", "Unknown") if previous else None
+
+        for metric, (extract, higher_is_better) in ACTIVITY_METRICS.items():
+            if old_type is not None and old_type != new_type:
+                athlete.topk(old_type, metric, self.k).set(activity_id, None)
+            if activity is None:
+                continue
+            value = extract(activity)
+            score = None if value is None else (value if higher_is_better else -value)
+            meta = {
+                "activity_id": activity_id,
+                "name": activity.get("name", "Untitled"),
+                "start_date": activity.get("start_date", ""),
+            }
+            athlete.topk(new_type, metric, self.k).set(activity_id, score, meta)
+
+        for metric, field in WEEKLY_METRICS.items():
+            touched = set()
+            for changed, sign in ((previous, -1), (activity, 1)):
+                if changed is None:
+                    continue
+                week = (changed.get("type", "Unknown"), _week_start(changed))
+                totals = athlete.weeks.setdefault(week, {})
+                totals[field] = totals.get(field, 0.0) + sign * float(changed.get(field) or 0.0)
+                touched.add(week)
+            for activity_type, week_start in touched:
+                total = athlete.weeks[(activity_type, week_start)][field]
+                athlete.topk(activity_type, metric, self.k).set(
+                    week_start, total if total > 0 else None, {"week_start": week_start}
+                )
+
+    def held_records(self, athlete: AthleteRecords, activity: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Records (rank 1) the activity or its week currently holds."""
+        activity_type = activity.get("type", "Unknown")
+        held = []
+        for metric, (extract, _) in ACTIVITY_METRICS.items():
+            top = athlete.top.get((activity_type, metric))
+            if top is not None and top.best_key() == activity["id"]:
+                held.append({"type": activity_type, "metric": metric, "value": extract(activity)})
+        week_start = _week_start(activity)
+        for metric, field in WEEKLY_METRICS.items():
+            top = athlete.top.get((activity_type, metric))
+            if top is not None and top.best_key() == week_start:
+                value = athlete.weeks[(activity_type, week_start)][field]
+                held.append({"type": activity_type, "metric": metric, "value": value})
+        return held
+
+    def on_activity_change(
+        self,
+        athlete_id: int,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        """
+        Activity store listener; publishes a ``record`` event for new PRs.
+
+        Athletes not in memory are skipped rather than rebuilt from their whole
+        history inside the store's write transaction; the next read builds
+        them, so new activities of such athletes publish no ``record`` event.
+        """
+        athlete = self._athletes.get(athlete_id)
+        if athlete is None:
+            return
+        self._apply(athlete, activity, previous)
+
+        if activity is not None and previous is None:
+            held = self.held_records(athlete, activity)
+            if held:
+                self.events.publish_on_commit(athlete_id, "record", {"activity_id": activity["id"], "records": held})
+
+
+records_index = PersonalRecordsIndex(
+    activity_store,
+    event_bus,
+    k=settings.RECORDS_TOP_K,
+    max_athletes=settings.RECORDS_MAX_ATHLETES,
+)
+activity_store.add_listener(records_index.on_activity_change)
@@ -0,0 +1,291 @@
+"""Per-athlete daily rollups kept current on activity ingest."""
+
+import calendar
+from array import array
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.activity_store import ActivityStore, activity_store
+
+METRICS = ("distance", "moving_time", "elevation_gain", "count")
+
+# Fixed cost of one (athlete, year) entry (rollup object, dicts, LRU slot)
+_YEAR_OVERHEAD = 512
+
+
+def activity_day(activity: Dict[str, Any]) -> date:
+    """Local calendar day an activity started on."""
+    start = activity.get("start_date_local") or activity.get("start_date", "")
+    return date.fromisoformat(start[:10])
+
+
+def activity_metrics(activity: Dict[str, Any]) -> Tuple[float, ...]:
+    """Values added to each of METRICS by one activity."""
+    return (
+        float(activity.get("distance") or 0.0),
+        float(activity.get("moving_time") or 0),
+        float(activity.get("total_elevation_gain") or 0.0),
+        1.0,
+    )
+
+
+class YearRollup:
+    """Daily totals of one athlete for one year, as parallel arrays per type."""
+
+    __slots__ = ("year", "days", "types")
+
+    def __init__(self, year: int):
+        self.year = year
+        self.days = 366 if calendar.isleap(year) else 365
+        self.types: Dict[str, Dict[str, array]] = {}
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the daily arrays: types x metrics x days x 8 bytes."""
+        return len(self.types) * len(METRICS) * self.days * 8 + _YEAR_OVERHEAD
+
+    def apply(self, activity: Dict[str, Any], sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one activity in O(1)."""
+        day = (activity_day(activity) - date(self.year, 1, 1)).days
+        if not 0 <= day < self.days:
+            return
+        activity_type = activity.get("type", "Unknown")
+        columns = self.types.get(activity_type)
+        if columns is None:
+            columns = {m: array("d", bytes(8 * self.days)) for m in METRICS}
+            self.types[activity_type] = columns
+        for metric, value in zip(METRICS, activity_metrics(activity)):
+            columns[metric][day] += sign * value
+
+
+class DailyRollupIndex:
+    """
+    Lazily built, incrementally maintained daily rollups.
+
+    A year is loaded from the activity store on first request and then kept
+    current by the store listener, so reads never rescan activities. Least
+    recently used years are evicted whenever the total exceeds ``max_bytes``.
+    """
+
+    def __init__(self, store: ActivityStore, max_bytes: int):
+        self.store = store
+        self.max_bytes = max_bytes
+        self._years: "OrderedDict[Tuple[int, int], YearRollup]" = OrderedDict()
+        self._sizes: Dict[Tuple[int, int], int] = {}
+        self._total_bytes = 0
+
+    def year(self, athlete_id: int, year: int) -> YearRollup:
+        key = (athlete_id, year)
+        # Under the store's lock, like the listener, so no write is missed
+        with self.store.db.transaction():
+            rollup = self._years.get(key)
+            if rollup is not None:
+                self._years.move_to_end(key)
+                return rollup
+
+            rollup = YearRollup(year)
+            # start_date is UTC; widen by a day so local-date edge cases are included
+            after = (date(year, 1, 1) - timedelta(days=1)).isoformat()
+            before = (date(year + 1, 1, 1) + timedelta(days=1)).isoformat()
+            for activity in self.store.list(athlete_id, after=after, before=before):
+                rollup.apply(activity, 1)
+            self._years[key] = rollup
+            self._resize(key)
+            return rollup
+
+    def _resize(self, key: Tuple[int, int]) -> None:
+        """Re-account a year's memory and evict others down to the budget."""
+        size = self._years[key].nbytes
+        self._total_bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+        # Least recently used first; the year just read or changed stays
+        for evicted in [k for k in self._years if k != key]:
+            if self._total_bytes <= self.max_bytes:
+                break
+            del self._years[evicted]
+            self._total_bytes -= self._sizes.pop(evicted)
+
+    def day_totals(self, athlete_id: int, day: date) -> Optional[Dict[str, Dict[str, float]]]:
+        """Totals per type for one day, or None if that year is not in memory."""
+        rollup = self._years.get((athlete_id, day.year))
+        if rollup is None:
+            return None
+        index = (day - date(day.year, 1, 1)).days
+        return {
+            t: {m: columns[m][index] for m in METRICS}
+            for t, columns in rollup.types.items()
+            if columns["count"][index]
+        }
+
+    def on_activity_change(
+        self,
+        athlete_id: int,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        """Activity store listener; only years already in memory are touched."""
+        if previous is not None:
+            rollup = self._years.get((athlete_id, activity_day(previous).year))
+            if rollup is not None:
+                rollup.apply(previous, -1)
+        if activity is not None:
+            key = (athlete_id, activity_day(activity).year)
+            rollup = self._years.get(key)
+            if rollup is not None:
+                rollup.apply(activity, 1)
+                # A new activity type adds columns
+                self._resize(key)
+
+
+daily_rollups = DailyRollupIndex(activity_store, max_bytes=int(settings.ROLLUP_CACHE_MEMORY_MB * 1024 * 1024))
+activity_store.add_listener(daily_rollups.on_activity_change)
+
+
+ALL_TYPES = "All"
+
+
+class CumulativeSeries:
+    """
+    Running totals per day since ``origin``, one array per metric.
+
+    ``columns[m][i]`` is the total of metric m from ``origin`` through day
+    ``origin + i``, so any range total is one subtraction and a cumulative
+    curve is one slice.
+    """
+
+    __slots__ = ("origin", "columns")
+
+    def __init__(self, origin: date):
+        self.origin = origin
+        self.columns: Dict[str, array] = {m: array("d") for m in METRICS}
+
+    def __len__(self) -> int:
+        return len(self.columns[METRICS[0]])
+
+    def add(self, day: date, values: Tuple[float, ...], sign: int = 1) -> None:
+        """Add one activity's values; O(1) for the latest day, O(days after) otherwise."""
+        index = (day - self.origin).days
+        length = len(self)
+        for metric, value in zip(METRICS, values):
+            column = self.columns[metric]
+            if index >= length:
+                # Extend with the running total carried forward
+                last = column[-1] if length else 0.0
+                column.extend([last] * (index + 1 - length))
+            delta = sign * value
+            for i in range(index, len(column)):
+                column[i] += delta
+
+    def total_through(self, day: date) -> Dict[str, float]:
+        """Totals from the origin through ``day`` inclusive."""
+        index = min((day - self.origin).days, len(self) - 1)
+        if index < 0:
+            return {m: 0.0 for m in METRICS}
+        return {m: self.columns[m][index] for m in METRICS}
+
+    def curve(self, start: date, end: date) -> Dict[str, list]:
+        """Cumulative totals within [start, end], one entry per day."""
+        base = self.total_through(start - timedelta(days=1))
+        days = (end - start).days + 1
+        first = (start - self.origin).days
+        result = {}
+        for metric in METRICS:
+            column = self.columns[metric]
+            last = len(column) - 1
+            values = []
+            for i in range(first, first + days):
+                through = column[min(i, last)] if i >= 0 and last >= 0 else 0.0
+                values.append(through - base[metric])
+            result[metric] = values
+        return result
+
+
+class PrefixSumIndex:
+    """
+    Per-athlete cumulative series per activity type (plus ``All``).
+
+    Built from the activity store on first use and extended by the store
+    listener; athletes are evicted least-recently-used.
+    """
+
+    def __init__(self, store: ActivityStore, max_athletes: int):
+        self.store = store
+        self.max_athletes = max_athletes
+        self._athletes: "OrderedDict[int, Dict[str, CumulativeSeries]]" = OrderedDict()
+
+    def series(self, athlete_id: int, activity_type: Optional[str] = None) -> Optional[CumulativeSeries]:
+        """Series for a type (all types when None), or None without activities."""
+        # Under the store's lock, like the listener, so no write is missed
+        with self.store.db.transaction():
+            athlete = self._athletes.get(athlete_id)
+            if athlete is None:
+                athlete = self._build(athlete_id)
+            else:
+                self._athletes.move_to_end(athlete_id)
+            return athlete.get(activity_type or ALL_TYPES)
+
+    def _build(self, athlete_id: int) -> Dict[str, CumulativeSeries]:
+        activities = self.store.list(athlete_id)
+        athlete: Dict[str, CumulativeSeries] = {}
+        if activities:
+            origin = min(activity_day(a) for a in activities)
+            daily: Dict[str, Dict[int, list]] = {}
+            for a in activities:
+                index = (activity_day(a) - origin).days
+                for key in (a.get("type", "Unknown"), ALL_TYPES):
+                    totals = daily.setdefault(key, {}).setdefault(index, [0.0] * len(METRICS))
+                    for i, value in enumerate(activity_metrics(a)):
+                        totals[i] += value
+            for key, days in daily.items():
+                # One pass per type: running sum over the daily increments
+                series = CumulativeSeries(origin)
+                length = max(days) + 1
+                for m, metric in enumerate(METRICS):
+                    running = 0.0
+                    column = series.columns[metric]
+                    for index in range(length):
+                        increment = days.get(index)
+                        if increment is not None:
+                            running += increment[m]
+                        column.append(running)
+                athlete[key] = series
+
+        self._athletes[athlete_id] = athlete
+        while len(self._athletes) > self.max_athletes:
+            self._athletes.popitem(last=False)
+        return athlete
+
+    def _apply(self, athlete_id: int, activity: Dict[str, Any], sign: int) -> bool:
+        """Apply one activity to a loaded athlete; False if a rebuild is needed."""
+        athlete = self._athletes[athlete_id]
+        day = activity_day(activity)
+        values = activity_metrics(activity)
+        for key in (activity.get("type", "Unknown"), ALL_TYPES):
+            series = athlete.get(key)
+            if series is None:
+                series = athlete[key] = CumulativeSeries(day)
+            elif day < series.origin:
+                return False
+            series.add(day, values, sign)
+        return True
+
+    def on_activity_change(
+        self,
+        athlete_id: int,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        """Activity store listener; only athletes already in memory are touched."""
+        if athlete_id not in self._athletes:
+            return
+        for changed, sign in ((previous, -1), (activity, 1)):
+            if changed is not None and not self._apply(athlete_id, changed, sign):
+                # Activity predates the series origin: rebuild lazily on next read
+                del self._athletes[athlete_id]
+                return
+
+
+prefix_sums = PrefixSumIndex(activity_store, max_athletes=settings.PREFIX_SUMS_MAX_ATHLETES)
+activity_store.add_listener(prefix_sums.on_activity_change)
@@ -0,0 +1,357 @@
+"""Repeated-route detection: grid-bucketed candidates confirmed by Fréchet distance."""
+
+import json
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.database import Database, db
+from app.services.activity_store import SCHEMA as ACTIVITIES_SCHEMA, activity_store
+from app.services.compute import ComputeExecutor, compute_executor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity_routes (
+    activity_id INTEGER PRIMARY KEY,
+    athlete_id INTEGER NOT NULL,
+    start_cell TEXT NOT NULL,
+    end_cell TEXT NOT NULL,
+    start_lat REAL NOT NULL,
+    start_lng REAL NOT NULL,
+    end_lat REAL NOT NULL,
+    end_lng REAL NOT NULL,
+    distance REAL NOT NULL,
+    track TEXT NOT NULL
+);
+"""
+
+INDEX = (
+    "CREATE INDEX IF NOT EXISTS ix_activity_routes_cells "
+    "ON activity_routes (athlete_id, start_cell, end_cell)"
+)
+
+EARTH_RADIUS_M = 6_371_000.0
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+LatLng = Tuple[float, float]
+
+
+def decode_polyline(encoded: str) -> List[LatLng]:
+    """Decode a Google encoded polyline (Strava's ``summary_polyline``)."""
+    points = []
+    index = lat = lng = 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        points.append((lat / 1e5, lng / 1e5))
+    return points
+
+
+def encode_polyline(points: Sequence[LatLng]) -> str:
+    """Encode points as a Google encoded polyline (inverse of ``decode_polyline``)."""
+    chunks = []
+    previous_lat = previous_lng = 0
+    for lat, lng in points:
+        current_lat, current_lng = round(lat * 1e5), round(lng * 1e5)
+        for delta in (current_lat - previous_lat, current_lng - previous_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            chunks.append(chr(value + 63))
+        previous_lat, previous_lng = current_lat, current_lng
+    return "".join(chunks)
+
+
+def grid_cell(point: LatLng, cell_m: float) -> Tuple[int, int]:
+    """
+    Grid cell of roughly ``cell_m`` x ``cell_m`` containing a point.
+
+    Rows are fixed bands of latitude; each row's column width is scaled by
+    the cosine of its centre latitude so cells stay close to square.
+    """
+    lat_step = cell_m / METERS_PER_DEGREE
+    row = math.floor(point[0] / lat_step)
+    return row, math.floor(point[1] / _lng_step(row, lat_step))
+
+
+def _lng_step(row: int, lat_step: float) -> float:
+    centre = min(abs((row + 0.5) * lat_step), 89.0)
+    return lat_step / math.cos(math.radians(centre))
+
+
+def neighbour_cells(point: LatLng, cell_m: float) -> List[str]:
+    """Keys of the cell containing ``point`` and the eight around it."""
+    lat_step = cell_m / METERS_PER_DEGREE
+    row, _ = grid_cell(point, cell_m)
+    keys = []
+    for r in (row - 1, row, row + 1):
+        col = math.floor(point[1] / _lng_step(r, lat_step))
+        keys.extend(f"{r}:{c}" for c in (col - 1, col, col + 1))
+    return keys
+
+
+def _cell_key(point: LatLng, cell_m: float) -> str:
+    row, col = grid_cell(point, cell_m)
+    return f"{row}:{col}"
+
+
+def _project(points: Sequence[LatLng], origin: LatLng) -> List[Tuple[float, float]]:
+    """Equirectangular projection to metres around ``origin``."""
+    scale = math.cos(math.radians(origin[0]))
+    return [
+        ((lng - origin[1]) * METERS_PER_DEGREE * scale, (lat - origin[0]) * METERS_PER_DEGREE)
+        for lat, lng in points
+    ]
+
+
+def resample(points: Sequence[LatLng], count: int) -> List[LatLng]:
+    """
+    ``count`` points evenly spaced along the track.
+
+    Even spacing makes the discrete Fréchet distance of two resampled tracks
+    a close approximation of the continuous one, whatever the GPS sampling.
+    """
+    if len(points) < 2:
+        return list(points)
+    xy = _project(points, points[0])
+    cumulative = [0.0]
+    for (x0, y0), (x1, y1) in zip(xy, xy[1:]):
+        cumulative.append(cumulative[-1] + math.hypot(x1 - x0, y1 - y0))
+    total = cumulative[-1]
+    if total == 0:
+        return [points[0]]
+
+    result = []
+    segment = 0
+    for i in range(count):
+        target = total * i / (count - 1)
+        while segment < len(points) - 2 and cumulative[segment + 1] < target:
+            segment += 1
+        span = cumulative[segment + 1] - cumulative[segment]
+        t = (target - cumulative[segment]) / span if span else 0.0
+        (lat0, lng0), (lat1, lng1) = points[segment], points[segment + 1]
+        result.append((round(lat0 + t * (lat1 - lat0), 6), round(lng0 + t * (lng1 - lng0), 6)))
+    return result
+
+
+def discrete_frechet(a: Sequence[Tuple[float, float]], b: Sequence[Tuple[float, float]]) -> float:
+    """Discrete Fréchet distance between two projected tracks, row by row in O(len(b)) memory."""
+    previous: List[float] = []
+    for i, (ax, ay) in enumerate(a):
+        current: List[float] = []
+        for j, (bx, by) in enumerate(b):
+            d = math.hypot(ax - bx, ay - by)
+            if i == 0 and j == 0:
+                reach = d
+            elif i == 0:
+                reach = max(current[j - 1], d)
+            elif j == 0:
+                reach = max(previous[0], d)
+            else:
+                reach = max(min(previous[j], previous[j - 1], current[j - 1]), d)
+            current.append(reach)
+        previous = current
+    return previous[-1] if previous else math.inf
+
+
+def frechet_matches(
+    track: Sequence[LatLng],
+    candidates: Sequence[Tuple[int, str]],
+    max_frechet_m: float,
+) -> List[Tuple[int, float]]:
+    """
+    Candidates within ``max_frechet_m`` of ``track``, closest first.
+
+    Candidates are (activity_id, JSON track) pairs. Pure and picklable, so it
+    runs in the compute executor.
+    """
+    origin = track[0]
+    projected = _project(track, origin)
+    matches = []
+    for activity_id, encoded in candidates:
+        other = _project([tuple(p) for p in json.loads(encoded)], origin)
+        # The first and last pairs are part of every coupling: cheap lower bound
+        if max(math.dist(projected[0], other[0]), math.dist(projected[-1], other[-1])) > max_frechet_m:
+            continue
+        distance = discrete_frechet(projected, other)
+        if distance <= max_frechet_m:
+            matches.append((activity_id, round(distance, 1)))
+    matches.sort(key=lambda m: m[1])
+    return matches
+
+
+def route_endpoints(activity: Dict[str, Any], track: List[LatLng]) -> Optional[Tuple[LatLng, LatLng]]:
+    start = activity.get("start_latlng") or (track[0] if track else None)
+    end = activity.get("end_latlng") or (track[-1] if track else None)
+    if not start or not end:
+        return None
+    return (start[0], start[1]), (end[0], end[1])
+
+
+class RouteIndex:
+    """
+    Finds activities that repeat a route.
+
+    Each activity with GPS is stored with the grid cells of its start and end
+    points and its track resampled to a fixed number of points. A query only
+    looks at activities whose start and end fall in the 3x3 neighbourhoods of
+    the query's cells (so the cost depends on how often a route was run, not
+    on the total number of activities), prunes by distance and endpoint gap,
+    and confirms the rest with the discrete Fréchet distance in the compute
+    executor.
+    """
+
+    def __init__(self, database: Database, executor: ComputeExecutor, cell_m: float, track_points: int):
+        self.db = database
+        self.executor = executor
+        self.cell_m = cell_m
+        self.track_points = track_points
+
+    def _ensure_schema(self) -> None:
+        self.db.ensure_schema("activity_routes", f"{SCHEMA};{INDEX}")
+
+    def migrate(self) -> int:
+        """
+        Create the table, indexing activities stored before it existed.
+
+        A one-off startup step: once the table exists the store listener keeps
+        it current, so no request ever pays for the backfill.
+
+        Returns:
+            Number of activities backfilled
+        """
+        self.db.ensure_schema("activities", ACTIVITIES_SCHEMA)
+        with self.db.transaction() as conn:
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'activity_routes'"
+            ).fetchone()
+            if exists is not None:
+                return 0
+            conn.execute(SCHEMA)
+            conn.execute(INDEX)
+            rows = conn.execute("SELECT athlete_id, data FROM activities").fetchall()
+            for row in rows:
+                self._store(conn, row["athlete_id"], json.loads(row["data"]))
+        return len(rows)
+
+    def _route_row(self, athlete_id: int, activity: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        encoded = (activity.get("map") or {}).get("summary_polyline")
+        track = decode_polyline(encoded) if encoded else []
+        endpoints = route_endpoints(activity, track)
+        if len(track) < 2 or endpoints is None:
+            return None
+        start, end = endpoints
+        return (
+            activity["id"],
+            athlete_id,
+            _cell_key(start, self.cell_m),
+            _cell_key(end, self.cell_m),
+            *start,
+            *end,
+            float(activity.get("distance") or 0.0),
+            json.dumps(resample(track, self.track_points), separators=(",", ":")),
+        )
+
+    def _store(self, conn: Any, athlete_id: int, activity: Dict[str, Any]) -> None:
+        row = self._route_row(athlete_id, activity)
+        if row is not None:
+            conn.execute(
+                "INSERT OR REPLACE INTO activity_routes "
+                "(activity_id, athlete_id, start_cell, end_cell, "
+                "start_lat, start_lng, end_lat, end_lng, distance, track) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+
+    def on_activity_change(
+        self,
+        athlete_id: int,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        """Activity store listener; runs inside the store's write transaction."""
+        self._ensure_schema()
+        conn = self.db.connection
+        if activity is None:
+            conn.execute("DELETE FROM activity_routes WHERE activity_id = ?", (previous["id"],))
+            return
+        if previous is not None and previous.get("map") == activity.get("map") \
+                and previous.get("distance") == activity.get("distance"):
+            # Title or type edits do not move the route
+            return
+        conn.execute("DELETE FROM activity_routes WHERE activity_id = ?", (activity["id"],))
+        self._store(conn, athlete_id, activity)
+
+    async def similar(
+        self,
+        athlete_id: int,
+        activity_id: int,
+        max_frechet_m: float,
+        distance_tolerance: float = 0.15,
+    ) -> Optional[List[Tuple[int, float]]]:
+        """
+        Activities of the athlete that follow the same route.
+
+        Args:
+            max_frechet_m: Largest Fréchet distance (metres) counted as the same
+                route; capped at the grid cell size, which bounds the search
+            distance_tolerance: Allowed relative difference in total distance
+
+        Returns:
+            (activity_id, Fréchet distance) pairs, closest first, or None if
+            the activity has no GPS track
+
+        Raises:
+            ComputeTimeout: Scoring the candidates took too long
+        """
+        self._ensure_schema()
+        target = self.db.fetchone(
+            "SELECT * FROM activity_routes WHERE activity_id = ? AND athlete_id = ?",
+            (activity_id, athlete_id),
+        )
+        if target is None:
+            return None
+        # A match's endpoints lie within the Fréchet distance of ours, so within
+        # one cell as long as the threshold does not exceed the cell size
+        max_frechet_m = min(max_frechet_m, self.cell_m)
+        start_cells = neighbour_cells((target["start_lat"], target["start_lng"]), self.cell_m)
+        end_cells = neighbour_cells((target["end_lat"], target["end_lng"]), self.cell_m)
+        low = target["distance"] * (1 - distance_tolerance)
+        high = target["distance"] * (1 + distance_tolerance)
+        candidates = self.db.fetchall(
+            "SELECT activity_id, track FROM activity_routes "
+            f"WHERE athlete_id = ? AND start_cell IN ({','.join('?' * 9)}) "
+            f"AND end_cell IN ({','.join('?' * 9)}) "
+            "AND distance BETWEEN ? AND ? AND activity_id != ?",
+            (athlete_id, *start_cells, *end_cells, low, high, activity_id),
+        )
+
+        if not candidates:
+            return []
+        return await self.executor.run(
+            frechet_matches,
+            [tuple(p) for p in json.loads(target["track"])],
+            [(row["activity_id"], row["track"]) for row in candidates],
+            max_frechet_m,
+            key=("similar", athlete_id, activity_id, max_frechet_m, distance_tolerance),
+        )
+
+
+route_index = RouteIndex(
+    db,
+    compute_executor,
+    cell_m=settings.ROUTE_CELL_METERS,
+    track_points=settings.ROUTE_TRACK_POINTS,
+)
+activity_store.add_listener(route_index.on_activity_change)
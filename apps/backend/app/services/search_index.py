@@ -0,0 +1,129 @@
+"""Full-text search index over activity names, descriptions and types."""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from app.core.database import Database, db
+from app.services.activity_store import SCHEMA as ACTIVITIES_SCHEMA, activity_store
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS activity_search USING fts5(
+    name,
+    description,
+    type,
+    athlete_id,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# bm25 column weights: name, description, type, athlete_id (scoping only)
+_BM25 = "bm25(activity_search, 10.0, 4.0, 2.0, 0.0)"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word must match; the last one is a prefix so results update while
+    the user is typing.
+    """
+    tokens = _TOKEN_RE.findall(text)
+    if not tokens:
+        return None
+    terms = [f'"{t}"' for t in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class ActivitySearchIndex:
+    """SQLite FTS5 index kept current by the activity store listener."""
+
+    def __init__(self, database: Database):
+        self.db = database
+        self._ready = False
+
+    def _ensure_schema(self) -> None:
+        if self._ready:
+            return
+        self.db.ensure_schema("activities", ACTIVITIES_SCHEMA)
+        with self.db.transaction() as conn:
+            row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'activity_search'").fetchone()
+            if row and "UNINDEXED" in row["sql"]:
+                # Older tables could not scope MATCH to one athlete; the
+                # backfill below rebuilds them
+                conn.execute("DROP TABLE activity_search")
+        self.db.ensure_schema("activity_search", SCHEMA)
+        # Backfill activities stored before the index existed
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO activity_search (rowid, name, description, type, athlete_id) "
+                "SELECT id, json_extract(data, '$.name'), json_extract(data, '$.description'), "
+                "type, CAST(athlete_id AS TEXT) FROM activities "
+                "WHERE id NOT IN (SELECT rowid FROM activity_search)"
+            )
+        # Not before the backfill commits: a rollback would undo it
+        self.db.on_commit(lambda: setattr(self, "_ready", True))
+
+    def on_activity_change(
+        self,
+        athlete_id: int,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        """Activity store listener; runs inside the store's write transaction."""
+        self._ensure_schema()
+        conn = self.db.connection
+        activity_id = (activity or previous)["id"]
+        conn.execute("DELETE FROM activity_search WHERE rowid = ?", (activity_id,))
+        if activity is None:
+            return
+        conn.execute(
+            "INSERT INTO activity_search (rowid, name, description, type, athlete_id) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                activity_id,
+                activity.get("name", ""),
+                activity.get("description") or "",
+                activity.get("sport_type") or activity.get("type", ""),
+                str(athlete_id),
+            ),
+        )
+
+    def search(
+        self,
+        athlete_id: int,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked matches for an athlete, best first.
+
+        Returns:
+            Rows with activity columns, a highlighted snippet and a bm25 score
+        """
+        self._ensure_schema()
+        match = build_match_query(query)
+        if match is None:
+            return []
+        # The athlete term is part of the MATCH, so only that athlete's rows are
+        # ranked; the query's own terms never match the athlete column
+        match = f'athlete_id : "{athlete_id}" AND {{name description type}} : ({match})'
+        rows = self.db.fetchall(
+            "SELECT a.id, json_extract(a.data, '$.name') AS name, a.type, a.start_date, "
+            "json_extract(a.data, '$.distance') AS distance, "
+            "json_extract(a.data, '$.moving_time') AS moving_time, "
+            "snippet(activity_search, -1, '<mark>', '</mark>', '…', 12) AS snippet, "
+            f"{_BM25} AS score "
+            "FROM activity_search JOIN activities a ON a.id = activity_search.rowid "
+            "WHERE activity_search MATCH ? "
+            "ORDER BY score LIMIT ? OFFSET ?",
+            (match, limit, offset),
+        )
+        return [dict(row) for row in rows]
+
+
+search_index = ActivitySearchIndex(db)
+activity_store.add_listener(search_index.on_activity_change)
@@ -0,0 +1,109 @@
+"""Local index of an athlete's segment efforts."""
+
+from typing import Any, Dict, List, Optional
+
+from app.core.database import Database, db
+from app.services.activity_store import activity_store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segment_efforts (
+    id INTEGER PRIMARY KEY,
+    athlete_id INTEGER NOT NULL,
+    segment_id INTEGER NOT NULL,
+    activity_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    elapsed_time INTEGER NOT NULL,
+    moving_time INTEGER NOT NULL,
+    distance REAL NOT NULL,
+    average_heartrate REAL,
+    average_watts REAL,
+    pr_rank INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_segment_efforts_athlete_segment
+    ON segment_efforts (athlete_id, segment_id, start_date);
+CREATE INDEX IF NOT EXISTS ix_segment_efforts_activity
+    ON segment_efforts (activity_id);
+"""
+
+
+class SegmentEffortIndex:
+    """
+    Segment efforts extracted from activity details on ingest.
+
+    Efforts are keyed by (athlete, segment, start date) so "my efforts on this
+    segment over time" is a single index range scan.
+    """
+
+    def __init__(self, database: Database):
+        self.db = database
+
+    def _ensure_schema(self) -> None:
+        self.db.ensure_schema("segment_efforts", SCHEMA)
+
+    def on_activity_change(
+        self,
+        athlete_id: int,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        """Activity store listener; runs inside the store's write transaction."""
+        self._ensure_schema()
+        conn = self.db.connection
+        if activity is None:
+            conn.execute("DELETE FROM segment_efforts WHERE activity_id = ?", (previous["id"],))
+            return
+        # Summaries carry no efforts; keep whatever a previous detail sync indexed
+        if "segment_efforts" not in activity:
+            return
+
+        conn.execute("DELETE FROM segment_efforts WHERE activity_id = ?", (activity["id"],))
+        conn.executemany(
+            "INSERT OR REPLACE INTO segment_efforts (id, athlete_id, segment_id, activity_id, name, "
+            "start_date, elapsed_time, moving_time, distance, average_heartrate, average_watts, pr_rank) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    effort["id"],
+                    athlete_id,
+                    effort.get("segment", {}).get("id"),
+                    activity["id"],
+                    effort.get("name", ""),
+                    effort.get("start_date", ""),
+                    effort.get("elapsed_time", 0),
+                    effort.get("moving_time", 0),
+                    effort.get("distance", 0.0),
+                    effort.get("average_heartrate"),
+                    effort.get("average_watts"),
+                    effort.get("pr_rank"),
+                )
+                for effort in activity["segment_efforts"] or []
+                if effort.get("segment", {}).get("id") is not None
+            ],
+        )
+
+    def efforts_for_segment(
+        self,
+        athlete_id: int,
+        segment_id: int,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        limit: int = 200,
+    ) -> List[Dict[str, Any]]:
+        """Efforts of an athlete on a segment, oldest first."""
+        self._ensure_schema()
+        sql = "SELECT * FROM segment_efforts WHERE athlete_id = ? AND segment_id = ?"
+        params: List[Any] = [athlete_id, segment_id]
+        if after:
+            sql += " AND start_date >= ?"
+            params.append(after)
+        if before:
+            sql += " AND start_date < ?"
+            params.append(before)
+        sql += " ORDER BY start_date LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.db.fetchall(sql, params)]
+
+
+segment_index = SegmentEffortIndex(db)
+activity_store.add_listener(segment_index.on_activity_change)
@@ -1,46 +1,20 @@
-"""Strava API Client Service with rate limiting."""
+"""Strava API Client Service with app-wide quota scheduling."""
 
-import asyncio
+import hashlib
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
 import httpx
 
 from app.core.config import settings
+from app.core.profiling import span
+from app.services.rate_limit import Priority, QuotaScheduler, RateLimiter
 
 
-class RateLimiter:
-    """Simple rate limiter for Strava API."""
-    
-    def __init__(self, requests_per_15min: int = 100, requests_per_day: int = 1000):
-        self.requests_per_15min = requests_per_15min
-        self.requests_per_day = requests_per_day
-        self.requests_15min: List[datetime] = []
-        self.requests_day: List[datetime] = []
-    
-    async def acquire(self) -> None:
-        """Wait if rate limit would be exceeded."""
-        now = datetime.now()
-        
-        # Clean old requests
-        cutoff_15min = now - timedelta(minutes=15)
-        cutoff_day = now - timedelta(days=1)
-        self.requests_15min = [t for t in self.requests_15min if t > cutoff_15min]
-        self.requests_day = [t for t in self.requests_day if t > cutoff_day]
-        
-        # Check limits
-        if len(self.requests_15min) >= self.requests_per_15min:
-            wait_time = (self.requests_15min[0] - cutoff_15min).total_seconds()
-            if wait_time > 0:
-                await asyncio.sleep(wait_time + 1)
-        
-        if len(self.requests_day) >= self.requests_per_day:
-            wait_time = (self.requests_day[0] - cutoff_day).total_seconds()
-            if wait_time > 0:
-                await asyncio.sleep(wait_time + 1)
-        
-        # Record request
-        self.requests_15min.append(now)
-        self.requests_day.append(now)
+# One scheduler for the whole application: Strava's limits are per app, not per user
+quota_scheduler = QuotaScheduler(
+    RateLimiter(settings.STRAVA_RATE_LIMIT_15MIN, settings.STRAVA_RATE_LIMIT_DAY),
+    interactive_reserve_15min=settings.STRAVA_INTERACTIVE_RESERVE_15MIN,
+    interactive_reserve_day=settings.STRAVA_INTERACTIVE_RESERVE_DAY,
+)
 
 
 class StravaApiClient:
@@ -48,9 +22,11 @@ class StravaApiClient:
     
     BASE_URL = "https://www.strava.com/api/v3"
     
-    def __init__(self, access_token: str):
+    def __init__(self, access_token: str, priority: Priority = Priority.INTERACTIVE):
         self.access_token = access_token
-        self.rate_limiter = RateLimiter()
+        self.priority = priority
+        # Fair-queuing key; a token identifies one athlete without exposing it
+        self.quota_key = hashlib.sha256(access_token.encode()).hexdigest()[:16]
     
     def _headers(self) -> Dict[str, str]:
         return {
@@ -66,20 +42,22 @@ class StravaApiClient:
         data: Optional[Dict] = None
     ) -> Any:
         """Make rate-limited request to Strava API."""
-        await self.rate_limiter.acquire()
+        with span("quota"):
+            await quota_scheduler.acquire(self.priority, self.quota_key)
         
         url = f"{self.BASE_URL}{endpoint}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                headers=self._headers(),
-                params=params,
-                json=data
-            )
-            response.raise_for_status()
-            return response.json()
+        with span("upstream"):
+            async with httpx.AsyncClient() as client:
+                response = await client.request(
+                    method=method,
+                    url=url,
+                    headers=self._headers(),
+                    params=params,
+                    json=data
+                )
+                response.raise_for_status()
+                return response.json()
     
     async def get(self, endpoint: str, params: Optional[Dict] = None) -> Any:
         return await self._request("GET", endpoint, params=params)
@@ -103,6 +81,11 @@ class StravaApiClient:
         """GET /athletes/{id}/stats - Get athlete stats."""
         return await self.get(f"/athletes/{athlete_id}/stats")
     
+    # Gear Endpoints
+    async def get_gear(self, gear_id: str) -> Dict[str, Any]:
+        """GET /gear/{id} - Get gear details."""
+        return await self.get(f"/gear/{gear_id}")
+    
     # Activities Endpoints
     async def get_activities(
         self,
@@ -115,7 +98,7 @@ class StravaApiClient:
         params = {"page": page, "per_page": per_page}
         if before:
             params["before"] = before
-        if after:
+        if after is not None:
             params["after"] = after
         return await self.get("/athlete/activities", params=params)
     
@@ -137,6 +120,10 @@ class StravaApiClient:
         }
         return await self.get(f"/activities/{activity_id}/streams", params=params)
     
+    async def get_activity_zones(self, activity_id: int) -> List[Dict[str, Any]]:
+        """GET /activities/{id}/zones - Get time-in-zone distribution."""
+        return await self.get(f"/activities/{activity_id}/zones")
+    
     async def get_activity_laps(self, activity_id: int) -> List[Dict[str, Any]]:
         """GET /activities/{id}/laps - Get activity laps."""
         return await self.get(f"/activities/{activity_id}/laps")
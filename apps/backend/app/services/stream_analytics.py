@@ -0,0 +1,59 @@
+"""CPU-bound analyses of activity streams, run through the compute executor."""
+
+from typing import Any, Dict, Optional, Sequence
+
+# Effort name -> distance in metres (names follow Strava's best_efforts)
+BEST_EFFORT_DISTANCES: Dict[str, float] = {
+    "400m": 400.0,
+    "1/2 mile": 804.67,
+    "1k": 1000.0,
+    "1 mile": 1609.34,
+    "2 mile": 3218.69,
+    "5k": 5000.0,
+    "10k": 10000.0,
+    "15k": 15000.0,
+    "10 mile": 16093.4,
+    "20k": 20000.0,
+    "Half-Marathon": 21097.5,
+    "30k": 30000.0,
+    "Marathon": 42195.0,
+}
+
+
+def best_efforts(
+    targets: Dict[str, float],
+    *,
+    time: Sequence[int],
+    distance: Sequence[float],
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Fastest time over each target distance, from the time and distance streams.
+
+    One sliding window per target: for every end point the start is advanced
+    while the window still covers the target, so each target is O(n).
+
+    Returns:
+        Target name -> ``{elapsed_time, start_index, end_index, distance}``,
+        or None when the activity is shorter than the target
+    """
+    n = min(len(time), len(distance))
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    for name, target in targets.items():
+        best = None
+        start = 0
+        for end in range(n):
+            covered = distance[end] - distance[start]
+            if covered < target:
+                continue
+            while start + 1 < end and distance[end] - distance[start + 1] >= target:
+                start += 1
+            elapsed = time[end] - time[start]
+            if best is None or elapsed < best[0]:
+                best = (elapsed, start, end, distance[end] - distance[start])
+        results[name] = None if best is None else {
+            "elapsed_time": int(best[0]),
+            "start_index": best[1],
+            "end_index": best[2],
+            "distance": round(best[3], 1),
+        }
+    return results
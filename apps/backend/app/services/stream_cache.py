@@ -0,0 +1,198 @@
+"""Local cache of activity streams stored as packed typed columns."""
+
+import sys
+import time
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.database import Database, db
+from app.services.activity_store import activity_store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity_streams (
+    athlete_id INTEGER NOT NULL,
+    activity_id INTEGER NOT NULL,
+    stream_type TEXT NOT NULL,
+    typecode TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    PRIMARY KEY (athlete_id, activity_id, stream_type)
+);
+CREATE INDEX IF NOT EXISTS ix_activity_streams_activity ON activity_streams (activity_id);
+"""
+
+# Integer-valued Strava streams; everything else is kept as float64
+_INT_STREAMS = frozenset({"time", "heartrate", "cadence", "watts", "temp", "moving"})
+
+
+class StreamColumn(NamedTuple):
+    """Location of one cached stream; ``length`` counts rows (pairs for latlng)."""
+
+    rowid: int
+    typecode: str
+    width: int
+    length: int
+
+
+def streams_by_type(payload: Any) -> Dict[str, List[Any]]:
+    """Normalize a Strava streams response (list or ``key_by_type`` dict)."""
+    items = payload.items() if isinstance(payload, dict) else ((s.get("type"), s) for s in payload or [])
+    return {stream_type: stream.get("data") or [] for stream_type, stream in items if stream_type}
+
+
+class PackedStream(NamedTuple):
+    """One stream encoded for storage."""
+
+    stream_type: str
+    typecode: str
+    width: int
+    length: int
+    data: bytes
+
+
+def pack_streams(requested: Iterable[str], streams: Dict[str, List[Any]]) -> List[PackedStream]:
+    """
+    Encode streams for ``ActivityStreamCache.save_packed``.
+
+    Requested types Strava did not return are packed empty, so they are not
+    fetched again. Pure and picklable, so it can run in a worker process.
+    """
+    packed = []
+    for stream_type in sorted(set(requested) | set(streams)):
+        data = streams.get(stream_type) or []
+        width = 1
+        if data and isinstance(data[0], (list, tuple)):
+            width = len(data[0])
+            data = [v for row in data for v in row]
+        if stream_type in _INT_STREAMS:
+            column = array("i", [int(v or 0) for v in data])
+        else:
+            column = array("d", [float("nan") if v is None else v for v in data])
+        if sys.byteorder == "big":
+            column.byteswap()
+        packed.append(PackedStream(stream_type, column.typecode, width, len(data) // width, column.tobytes()))
+    return packed
+
+
+class ActivityStreamCache:
+    """
+    Streams fetched from Strava, kept per viewing athlete in SQLite.
+
+    Each stream is one little-endian BLOB so exports can read a range of rows
+    at a time instead of materializing the whole activity.
+    """
+
+    def __init__(self, database: Database, max_activities: int, prune_every: int):
+        self.db = database
+        self.max_activities = max_activities
+        self.prune_every = prune_every
+        self._saves_since_prune = 0
+
+    def _ensure_schema(self) -> None:
+        self.db.ensure_schema("activity_streams", SCHEMA)
+
+    def save(self, athlete_id: int, activity_id: int, requested: Iterable[str], streams: Dict[str, List[Any]]) -> None:
+        """Store fetched streams (see ``pack_streams``)."""
+        self.save_packed(athlete_id, activity_id, pack_streams(requested, streams))
+
+    def save_packed(
+        self,
+        athlete_id: int,
+        activity_id: int,
+        packed: List[PackedStream],
+        prune: bool = True,
+    ) -> None:
+        """
+        Store streams already encoded with ``pack_streams``.
+
+        The cache is pruned every ``prune_every`` saves, so it may briefly
+        hold that many activities over the limit. Bulk writers pass
+        ``prune=False`` and call ``prune`` once at the end.
+        """
+        self._ensure_schema()
+        now = int(time.time())
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO activity_streams "
+                "(athlete_id, activity_id, stream_type, typecode, width, length, data, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(athlete_id, activity_id, *p, now) for p in packed],
+            )
+            if prune:
+                self._saves_since_prune += 1
+                if self._saves_since_prune >= self.prune_every:
+                    self.prune()
+
+    def prune(self) -> None:
+        """Keep only the ``max_activities`` most recently fetched activities."""
+        self._ensure_schema()
+        self._saves_since_prune = 0
+        with self.db.transaction() as conn:
+            conn.execute(
+                "DELETE FROM activity_streams WHERE activity_id IN ("
+                "SELECT activity_id FROM activity_streams GROUP BY activity_id "
+                "ORDER BY MAX(fetched_at) DESC LIMIT -1 OFFSET ?)",
+                (self.max_activities,),
+            )
+
+    def columns(self, athlete_id: int, activity_id: int, types: Iterable[str]) -> Dict[str, StreamColumn]:
+        """Cached streams among ``types`` (empty ones included)."""
+        self._ensure_schema()
+        types = list(types)
+        rows = self.db.fetchall(
+            "SELECT rowid, stream_type, typecode, width, length FROM activity_streams "
+            f"WHERE athlete_id = ? AND activity_id = ? AND stream_type IN ({','.join('?' * len(types))})",
+            (athlete_id, activity_id, *types),
+        )
+        return {r["stream_type"]: StreamColumn(r["rowid"], r["typecode"], r["width"], r["length"]) for r in rows}
+
+    def read(self, column: StreamColumn, start: int, stop: int) -> array:
+        """Values of rows [start, stop) of a cached stream, flattened."""
+        stop = min(stop, column.length)
+        values = array(column.typecode)
+        if start >= stop:
+            return values
+        item = values.itemsize * column.width
+        with self.db.transaction() as conn:
+            if hasattr(conn, "blobopen"):
+                # Incremental BLOB I/O reads only the requested bytes
+                with conn.blobopen("activity_streams", "data", column.rowid, readonly=True) as blob:
+                    blob.seek(start * item)
+                    raw = blob.read((stop - start) * item)
+            else:
+                raw = conn.execute(
+                    "SELECT substr(data, ?, ?) FROM activity_streams WHERE rowid = ?",
+                    (start * item + 1, (stop - start) * item, column.rowid),
+                ).fetchone()[0]
+        values.frombytes(raw)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def iter_chunks(self, columns: Dict[str, StreamColumn], chunk_rows: int) -> Iterator[Dict[str, array]]:
+        """Yield ``{type: values}`` for consecutive row ranges of all columns."""
+        length = max((c.length for c in columns.values()), default=0)
+        for start in range(0, length, chunk_rows):
+            yield {t: self.read(c, start, start + chunk_rows) for t, c in columns.items()}
+
+    def on_activity_change(
+        self,
+        athlete_id: int,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        """Activity store listener; drops streams of deleted activities."""
+        if activity is None and previous is not None:
+            self._ensure_schema()
+            self.db.connection.execute("DELETE FROM activity_streams WHERE activity_id = ?", (previous["id"],))
+
+
+stream_cache = ActivityStreamCache(
+    db,
+    max_activities=settings.STREAM_CACHE_MAX_ACTIVITIES,
+    prune_every=settings.STREAM_CACHE_PRUNE_EVERY,
+)
+activity_store.add_listener(stream_cache.on_activity_change)
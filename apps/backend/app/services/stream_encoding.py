@@ -0,0 +1,205 @@
+"""
+Wire encodings for activity streams.
+
+Besides JSON, streams can be sent as typed binary columns:
+
+* ``application/vnd.strarun.columns`` - packed little-endian columns. The body
+  is a uint32 header length, a UTF-8 JSON header padded to 4 bytes, then one
+  buffer per column. The header lists each column's ``name``, ``dtype``
+  (``float32`` or ``int32``), ``width`` (2 for ``latlng`` pairs), ``offset``
+  from the start of the data section and ``length`` in rows, so a client can
+  wrap each buffer in a Float32Array/Int32Array without copying.
+* ``application/vnd.apache.arrow.stream`` - Arrow IPC stream, when pyarrow is
+  installed.
+
+Any representation can additionally be compressed with gzip or brotli.
+"""
+
+import gzip
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+try:  # Optional: Arrow IPC output
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - depends on installed extras
+    pyarrow = None
+
+try:  # Optional: brotli content encoding
+    import brotli
+except ImportError:  # pragma: no cover - depends on installed extras
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+COLUMNS_MEDIA_TYPE = "application/vnd.strarun.columns"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Strava stream type -> (array typecode, wire dtype)
+_STREAM_DTYPES: Dict[str, Tuple[str, str]] = {
+    "time": ("i", "int32"),
+    "distance": ("f", "float32"),
+    "latlng": ("f", "float32"),
+    "altitude": ("f", "float32"),
+    "velocity_smooth": ("f", "float32"),
+    "heartrate": ("i", "int32"),
+    "cadence": ("i", "int32"),
+    "watts": ("i", "int32"),
+    "temp": ("i", "int32"),
+    "moving": ("i", "int32"),
+    "grade_smooth": ("f", "float32"),
+}
+
+# Skip compressing bodies too small to benefit
+MIN_COMPRESS_BYTES = 1024
+
+# Streams with at least this many values are encoded and compressed in a
+# worker thread (zlib and brotli release the GIL while compressing), so a
+# large response does not stall every other request on the event loop
+THREADED_ENCODE_VALUES = 10_000
+
+
+def _parse_header_values(header: Optional[str]) -> List[Tuple[str, float]]:
+    """Parse ``a;q=0.5, b`` style header values, best first."""
+    values = []
+    for position, part in enumerate((header or "").split(",")):
+        pieces = [p.strip() for p in part.split(";")]
+        if not pieces[0]:
+            continue
+        q = 1.0
+        for param in pieces[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            values.append((pieces[0].lower(), q, position))
+    values.sort(key=lambda v: (-v[1], v[2]))
+    return [(v[0], v[1]) for v in values]
+
+
+def available_media_types() -> List[str]:
+    types = [JSON_MEDIA_TYPE, COLUMNS_MEDIA_TYPE]
+    if pyarrow is not None:
+        types.append(ARROW_MEDIA_TYPE)
+    return types
+
+
+def negotiate_media_type(accept: Optional[str]) -> Optional[str]:
+    """
+    Pick the best supported media type for an Accept header.
+
+    Returns:
+        The media type, or None if nothing acceptable is supported
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+    supported = available_media_types()
+    for media_type, _ in _parse_header_values(accept):
+        if media_type in supported:
+            return media_type
+        if media_type in ("*/*", "application/*"):
+            return JSON_MEDIA_TYPE
+    return None
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick ``br`` or ``gzip`` from an Accept-Encoding header, if allowed."""
+    for coding, _ in _parse_header_values(accept_encoding):
+        if coding == "br" and brotli is not None:
+            return "br"
+        if coding in ("gzip", "*"):
+            return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """Compress a body with the negotiated encoding (or leave it alone)."""
+    if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if encoding == "br":
+        return brotli.compress(body, quality=5), "br"
+    return gzip.compress(body, compresslevel=6), "gzip"
+
+
+def _column(stream_type: str, data: List[Any]) -> Tuple[array, str, int]:
+    typecode, dtype = _STREAM_DTYPES.get(stream_type, ("f", "float32"))
+    width = 1
+    if data and isinstance(data[0], (list, tuple)):
+        width = len(data[0])
+        data = [v for row in data for v in row]
+    if typecode == "i":
+        column = array("i", (int(v) for v in data))
+    else:
+        column = array("f", data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column, dtype, width
+
+
+def encode_columns(activity_id: int, streams: Dict[str, List[Any]]) -> bytes:
+    """Encode streams as packed little-endian typed columns."""
+    columns = []
+    buffers = []
+    offset = 0
+    for name, data in streams.items():
+        column, dtype, width = _column(name, data)
+        raw = column.tobytes()
+        columns.append({
+            "name": name,
+            "dtype": dtype,
+            "width": width,
+            "offset": offset,
+            "length": len(column) // width,
+        })
+        buffers.append(raw)
+        offset += len(raw)
+
+    header = json.dumps({"activity_id": activity_id, "columns": columns}).encode()
+    header += b" " * (-len(header) % 4)
+    return struct.pack("<I", len(header)) + header + b"".join(buffers)
+
+
+def encode_arrow(activity_id: int, streams: Dict[str, List[Any]]) -> bytes:
+    """Encode streams as an Arrow IPC stream with one column per stream."""
+    arrays = []
+    names = []
+    for name, data in streams.items():
+        _, dtype = _STREAM_DTYPES.get(name, ("f", "float32"))
+        value_type = pyarrow.int32() if dtype == "int32" else pyarrow.float32()
+        if data and isinstance(data[0], (list, tuple)):
+            value_type = pyarrow.list_(value_type, len(data[0]))
+        arrays.append(pyarrow.array(data, type=value_type))
+        names.append(name)
+
+    # Strava returns equal-length streams; pad defensively so the batch is valid
+    length = max((len(a) for a in arrays), default=0)
+    arrays = [
+        a if len(a) == length else pyarrow.concat_arrays([a, pyarrow.nulls(length - len(a), a.type)])
+        for a in arrays
+    ]
+    batch = pyarrow.record_batch(arrays, names=names)
+    schema = batch.schema.with_metadata({"activity_id": str(activity_id)})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch.replace_schema_metadata(schema.metadata))
+    return sink.getvalue().to_pybytes()
+
+
+def encode_streams(
+    activity_id: int,
+    streams: Dict[str, List[Any]],
+    media_type: str,
+    encoding: Optional[str],
+) -> Tuple[bytes, Optional[str]]:
+    """Encode streams as ``media_type`` and compress them; see ``compress``."""
+    if media_type == COLUMNS_MEDIA_TYPE:
+        body = encode_columns(activity_id, streams)
+    elif media_type == ARROW_MEDIA_TYPE:
+        body = encode_arrow(activity_id, streams)
+    else:
+        body = json.dumps({"activity_id": activity_id, "streams": streams}, separators=(",", ":")).encode()
+    return compress(body, encoding)
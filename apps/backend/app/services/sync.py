@@ -0,0 +1,102 @@
+"""Incremental activity sync from Strava into the local store."""
+
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.dates import to_epoch
+from app.models.activity import SyncResult
+from app.services.activity_store import ActivityStore, activity_store
+from app.services.cache import TTLCache
+from app.services.events import EventBus, event_bus
+from app.services.strava_client import StravaApiClient
+from app.services.zone_index import ZoneHistogramIndex, zone_index
+
+
+class ActivitySyncService:
+    """Pulls new activities (with all segment efforts) into the local store."""
+
+    PAGE_SIZE = 100
+
+    def __init__(self, store: ActivityStore, zones: ZoneHistogramIndex, events: EventBus):
+        self.store = store
+        self.zones = zones
+        self.events = events
+        # Athletes whose zones Strava refuses (402/403: no subscription), so
+        # later activities skip the call
+        self._zones_refused = TTLCache(ttl_seconds=settings.ZONES_CACHE_TTL_SECONDS, max_entries=10_000)
+
+    async def sync_athlete(
+        self,
+        client: StravaApiClient,
+        athlete_id: int,
+        max_activities: Optional[int] = None,
+    ) -> SyncResult:
+        """
+        Ingest activities newer than the latest stored one, oldest first.
+
+        Each activity costs one detail request, so a run is capped at
+        ``max_activities``; calling again resumes where the last run stopped.
+
+        Args:
+            client: Strava client for the athlete
+            athlete_id: Owner of the synced activities
+            max_activities: Cap on detail fetches for this run
+
+        Returns:
+            SyncResult with the number of ingested activities
+        """
+        limit = max_activities or settings.SYNC_MAX_ACTIVITIES
+        self.events.publish(athlete_id, "sync", {"status": "started", "synced": 0, "limit": limit})
+        try:
+            result = await self._run(client, athlete_id, limit)
+        except Exception as e:
+            self.events.publish(athlete_id, "sync", {"status": "failed", "error": str(e)})
+            raise
+        self.events.publish(athlete_id, "sync", {"status": "completed", "limit": limit, **result.model_dump()})
+        return result
+
+    async def _run(self, client: StravaApiClient, athlete_id: int, limit: int) -> SyncResult:
+        latest = self.store.latest_start_date(athlete_id)
+        after = to_epoch(latest) if latest else 0
+
+        synced = 0
+        page = 1
+        while synced < limit:
+            # With `after`, Strava returns activities in ascending start order
+            summaries = await client.get_activities(
+                page=page, per_page=self.PAGE_SIZE, after=after
+            )
+            if not summaries:
+                return SyncResult(synced=synced, complete=True)
+            for summary in summaries:
+                if synced >= limit:
+                    return SyncResult(synced=synced, complete=False)
+                detail = await client.get_activity(summary["id"], include_all_efforts=True)
+                self.store.upsert(athlete_id, detail)
+                if settings.SYNC_ZONE_HISTOGRAMS and (detail.get("has_heartrate") or detail.get("device_watts")):
+                    await self._save_zones(client, athlete_id, detail)
+                synced += 1
+                self.events.publish(athlete_id, "sync", {"status": "progress", "synced": synced, "limit": limit})
+            if len(summaries) < self.PAGE_SIZE:
+                return SyncResult(synced=synced, complete=True)
+            page += 1
+        return SyncResult(synced=synced, complete=False)
+
+    async def _save_zones(self, client: StravaApiClient, athlete_id: int, detail: Dict[str, Any]) -> None:
+        """Store the activity's zone histograms; optional, so failures only skip them."""
+        if self._zones_refused.get(athlete_id):
+            return
+        try:
+            zones = await client.get_activity_zones(detail["id"])
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (402, 403):
+                self._zones_refused.set(athlete_id, True)
+            return
+        except httpx.HTTPError:
+            return
+        self.zones.save(athlete_id, detail, zones)
+
+
+sync_service = ActivitySyncService(activity_store, zone_index, event_bus)
@@ -0,0 +1,108 @@
+"""Per-activity time-in-zone histograms for range aggregation."""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from app.core.database import Database, db
+from app.services.activity_store import activity_store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity_zones (
+    activity_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    athlete_id INTEGER NOT NULL,
+    start_date TEXT NOT NULL,
+    seconds TEXT NOT NULL,
+    PRIMARY KEY (activity_id, kind)
+);
+CREATE INDEX IF NOT EXISTS ix_activity_zones_athlete_start
+    ON activity_zones (athlete_id, start_date);
+"""
+
+ZONE_KINDS = ("heartrate", "power")
+
+
+def _add_into(total: List[int], values: List[int]) -> None:
+    if len(total) < len(values):
+        total.extend([0] * (len(values) - len(total)))
+    for i, v in enumerate(values):
+        total[i] += v
+
+
+class ZoneHistogramIndex:
+    """
+    Stores one seconds-per-zone vector per activity and kind.
+
+    Range queries only sum precomputed vectors; no activity streams are read.
+    """
+
+    def __init__(self, database: Database):
+        self.db = database
+
+    def _ensure_schema(self) -> None:
+        self.db.ensure_schema("activity_zones", SCHEMA)
+
+    def save(self, athlete_id: int, activity: Dict[str, Any], zones: List[Dict[str, Any]]) -> None:
+        """Store the histograms from GET /activities/{id}/zones."""
+        self._ensure_schema()
+        rows = []
+        for entry in zones or []:
+            kind = entry.get("type")
+            if kind not in ZONE_KINDS:
+                continue
+            seconds = [int(b.get("time", 0)) for b in entry.get("distribution_buckets", [])]
+            rows.append((activity["id"], kind, athlete_id, activity.get("start_date", ""), json.dumps(seconds)))
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM activity_zones WHERE activity_id = ?", (activity["id"],))
+            conn.executemany(
+                "INSERT INTO activity_zones (activity_id, kind, athlete_id, start_date, seconds) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def on_activity_change(
+        self,
+        athlete_id: int,
+        activity: Optional[Dict[str, Any]],
+        previous: Optional[Dict[str, Any]],
+    ) -> None:
+        """Activity store listener; keeps histogram rows in step with activities."""
+        if previous is None:
+            return
+        self._ensure_schema()
+        conn = self.db.connection
+        if activity is None:
+            conn.execute("DELETE FROM activity_zones WHERE activity_id = ?", (previous["id"],))
+        elif activity.get("start_date") != previous.get("start_date"):
+            conn.execute(
+                "UPDATE activity_zones SET start_date = ? WHERE activity_id = ?",
+                (activity.get("start_date", ""), activity["id"]),
+            )
+
+    def distribution(
+        self,
+        athlete_id: int,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Sum of time-in-zone vectors over activities in [after, before)."""
+        self._ensure_schema()
+        sql = "SELECT activity_id, kind, seconds FROM activity_zones WHERE athlete_id = ?"
+        params: List[Any] = [athlete_id]
+        if after:
+            sql += " AND start_date >= ?"
+            params.append(after)
+        if before:
+            sql += " AND start_date < ?"
+            params.append(before)
+
+        totals: Dict[str, List[int]] = {kind: [] for kind in ZONE_KINDS}
+        activity_ids = set()
+        for row in self.db.fetchall(sql, params):
+            activity_ids.add(row["activity_id"])
+            _add_into(totals[row["kind"]], json.loads(row["seconds"]))
+        return {"activities": len(activity_ids), **totals}
+
+
+zone_index = ZoneHistogramIndex(db)
+activity_store.add_listener(zone_index.on_activity_change)
@@ -3,11 +3,34 @@ StraRun Backend - FastAPI Application
 Main entry point for the Strava Dashboard API
 """
 
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import router as api_router
 from app.core.config import settings
+from app.core.profiling import ProfiledJSONResponse, ProfilingMiddleware
+from app.services.compute import compute_executor
+from app.services.route_index import route_index
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not settings.STRAVA_WEBHOOK_SUBSCRIPTION_ID:
+        logger.warning(
+            "STRAVA_WEBHOOK_SUBSCRIPTION_ID is not set: every Strava webhook event is "
+            "rejected, so deletes and profile changes reach local data only on the next sync"
+        )
+    # One-off backfill of the route index for activities stored before it existed
+    route_index.migrate()
+    yield
+    # Stop compute worker processes with the server
+    compute_executor.shutdown()
+
 
 app = FastAPI(
     title="StraRun API",
@@ -15,6 +38,8 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ProfiledJSONResponse,
+    lifespan=lifespan,
 )
 
 # CORS Configuration
@@ -26,6 +51,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per-request profiling (requires PROFILING_SECRET)
+app.add_middleware(ProfilingMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
 